@@ -0,0 +1,227 @@
+"""
+Streaming batch solver for the Mastermind Genetic Algorithm
+
+This code solves every secret code of a corpus (JSONL or CSV file, or standard
+input) with the same configuration, and writes one JSON line per secret with
+its number of generations, of score evaluations and its wall time. A game still
+running after MAX_GENERATIONS is abandoned and written with "found": false, so
+that one secret cannot hold back the rest of the corpus.
+The corpus is read as a stream and only a bounded number of secrets are in
+flight, so the memory used does not depend on the size of the corpus.
+
+Input lines:
+- JSONL: ["Red", "Blue", "Green", "Red"] or {"secret": [...], "id": ...}
+- CSV:   Red,Blue,Green,Red
+"""
+
+##---IMPORTS---##
+##-------------##
+import argparse
+import collections
+import concurrent.futures
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+
+# Pygame's greeting would be mixed with the results written on stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from mastermindv1_pygame import (  # noqa: E402
+    COLORS,
+    MAX_MUTATION_RATE,
+    MAX_POPULATION_SIZE,
+    MAX_TARGET_LENGTH,
+    MIN_MUTATION_RATE,
+    MIN_POPULATION_SIZE,
+    MIN_TARGET_LENGTH,
+    MastermindGame,
+)
+
+##---CONSTANTS VARIABLES---##
+##-------------------------##
+CHUNK_SIZE = 32  # secrets sent to a worker at once
+TASKS_PER_WORKER = 4  # chunks in flight per worker
+MAX_GENERATIONS = 100000  # a game still running after that is abandoned
+
+
+##---READING AND SOLVING---##
+##-------------------------##
+def read_secrets(file, input_format):
+    # Yields (secret, id) one line at a time, id is None if not given
+    if input_format == "csv":
+        for row in csv.reader(file):
+            if row:
+                yield [color.strip() for color in row], None
+        return
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line, None  # Reported as an invalid secret
+            continue
+        if isinstance(record, dict):
+            yield record.get("secret"), record.get("id")
+        else:
+            yield record, None
+
+
+def solve_secret(index, secret, config):
+    if (
+        not isinstance(secret, list)
+        or not MIN_TARGET_LENGTH <= len(secret) <= MAX_TARGET_LENGTH
+        or any(color not in COLORS for color in secret)
+    ):
+        return {"index": index, "secret": secret, "error": "invalid secret"}
+
+    # Each secret gets its own seed, so results do not depend on the workers
+    seed = None if config["seed"] is None else config["seed"] + index
+    start = time.perf_counter()
+    game = MastermindGame(
+        target_length=len(secret),
+        population_size=config["population"],
+        mutation_rate=config["mutation"],
+        show_secret_code=False,
+        show_best=False,
+        consistency_mode=config["consistency"],
+        deduplicate=config["dedup"],
+        seed=seed,
+        secret=secret,
+    )
+    game.check_solution()
+    while not game.found and game.generation < MAX_GENERATIONS:
+        game.next_generation()
+        game.check_solution()
+    return {
+        "index": index,
+        "secret": secret,
+        "found": game.found,
+        "generations": game.generation,
+        "evaluations": game.evaluations,
+        "wall_time": round(time.perf_counter() - start, 6),
+    }
+
+
+def solve_chunk(chunk, config):
+    results = []
+    for index, secret, secret_id in chunk:
+        result = solve_secret(index, secret, config)
+        if secret_id is not None:
+            result["id"] = secret_id
+        results.append(result)
+    return results
+
+
+def numbered_chunks(secrets, chunk_size):
+    numbered = (
+        (index, secret, secret_id) for index, (secret, secret_id) in enumerate(secrets)
+    )
+    while True:
+        chunk = list(itertools.islice(numbered, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solve_stream(secrets, config, workers=None, ordered=True, chunk_size=CHUNK_SIZE):
+    # Yields the results as they complete, in input order if ordered is True
+    chunks = numbered_chunks(secrets, chunk_size)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            yield from solve_chunk(chunk, config)
+        return
+
+    max_in_flight = workers * TASKS_PER_WORKER
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        in_flight = collections.deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(solve_chunk, chunk, config))
+            while len(in_flight) >= max_in_flight:
+                yield from take_results(in_flight, ordered)
+        while in_flight:
+            yield from take_results(in_flight, ordered)
+
+
+def take_results(in_flight, ordered):
+    # Waits for the oldest chunk, or for any chunk if the order does not matter
+    if ordered:
+        return in_flight.popleft().result()
+    done, _ = concurrent.futures.wait(
+        in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+    )
+    future = next(iter(done))
+    in_flight.remove(future)
+    return future.result()
+
+
+##---COMMAND LINE---##
+##------------------##
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Résout un fichier de codes secrets")
+    parser.add_argument("input", help="fichier JSONL ou CSV, - pour l'entrée standard")
+    parser.add_argument("--output", default="-", help="fichier JSONL des résultats")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default=None)
+    parser.add_argument("--workers", type=int, default=None, help="processus")
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="écrit les résultats dès qu'ils sont prêts",
+    )
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--population", type=int, default=8, help="taille population")
+    parser.add_argument("--mutation", type=int, default=80, help="mutation (%%)")
+    parser.add_argument(
+        "--consistency", action="store_true", help="mode cohérence (un essai par coup)"
+    )
+    parser.add_argument("--dedup", action="store_true", help="population sans doublons")
+    parser.add_argument("--seed", type=int, default=None, help="graine aléatoire")
+    args = parser.parse_args(argv)
+    if not MIN_POPULATION_SIZE <= args.population <= MAX_POPULATION_SIZE:
+        parser.error(
+            f"--population doit être entre {MIN_POPULATION_SIZE} "
+            f"et {MAX_POPULATION_SIZE}"
+        )
+    if not MIN_MUTATION_RATE <= args.mutation <= MAX_MUTATION_RATE:
+        parser.error(
+            f"--mutation doit être entre {MIN_MUTATION_RATE} et {MAX_MUTATION_RATE}"
+        )
+
+    # The length of each game is the length of its secret
+    config = {
+        "population": args.population,
+        "mutation": args.mutation,
+        "consistency": args.consistency,
+        "dedup": args.dedup,
+        "seed": args.seed,
+    }
+    input_format = args.format or ("csv" if args.input.endswith(".csv") else "jsonl")
+    input_file = sys.stdin if args.input == "-" else open(args.input, newline="")
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w")
+
+    start = time.perf_counter()
+    count = 0
+    for result in solve_stream(
+        read_secrets(input_file, input_format),
+        config,
+        workers=args.workers,
+        ordered=not args.unordered,
+        chunk_size=args.chunk_size,
+    ):
+        output_file.write(json.dumps(result) + "\n")
+        count += 1
+    output_file.flush()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{count} codes résolus en {elapsed:.2f} s ({count / elapsed:.0f} codes/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
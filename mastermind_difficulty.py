@@ -0,0 +1,274 @@
+"""
+Difficulty map of the secret codes for the Mastermind Genetic Algorithm
+
+This code plays the same seeded games against the secret codes of a given length
+and ranks them by the number of generations the Genetic Algorithm needs.
+
+Without the consistency mode, the score only counts the exact matches, and the
+scoring, the mutation (uniform over the other colors), the crossover, the
+deduplication and the adaptive modes do not change if the colors are relabelled
+independently at each position. Any secret can be relabelled into any other,
+so all the 6^L secrets are equally difficult and a single one is played.
+
+The consistency mode also compares the partial matches, which only keep the
+color multiplicities: two secrets with the same multiplicities (for instance
+Red Red Blue Green and White Green White Black, 2+1+1) are equally difficult.
+Each class is an integer partition of the length into at most len(COLORS)
+parts, and one representative per class is played.
+
+With --exhaustive, all the 6^L secrets are played, to check it.
+"""
+
+##---IMPORTS---##
+##-------------##
+import argparse
+import collections
+import heapq
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import time
+
+# Pygame's greeting would be mixed with the table written on stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from mastermindv1_pygame import (  # noqa: E402
+    COLORS,
+    EXPERIMENTS_CONFIDENCE,
+    MUTATION_MODES,
+    GameBatch,
+    MastermindGame,
+    RunningStats,
+)
+
+##---CONSTANTS VARIABLES---##
+##-------------------------##
+CHUNK_SIZE = 16  # secrets sent to a worker at once
+HARDEST_SECRETS = 10  # length of the ranked list of the hardest secrets
+
+
+##---SECRET CLASSES---##
+##--------------------##
+def secret_classes(length, max_parts=len(COLORS), largest=None):
+    # Integer partitions of length into at most max_parts parts, largest first
+    if length == 0:
+        yield ()
+        return
+    if max_parts == 0:
+        return
+    largest = length if largest is None else largest
+    for part in range(min(length, largest), 0, -1):
+        for rest in secret_classes(length - part, max_parts - 1, part):
+            yield (part,) + rest
+
+
+def secret_class(secret):
+    # Color multiplicities of a secret, largest first
+    return tuple(sorted(collections.Counter(secret).values(), reverse=True))
+
+
+def class_size(partition):
+    # Arrangements of the multiset, times the ways to give colors to the parts
+    arrangements = math.factorial(sum(partition))
+    for part in partition:
+        arrangements //= math.factorial(part)
+    colorings = math.perm(len(COLORS), len(partition))
+    for repeated in collections.Counter(partition).values():
+        colorings //= math.factorial(repeated)
+    return arrangements * colorings
+
+
+def representative(partition):
+    return [color for color, part in zip(COLORS, partition) for _ in range(part)]
+
+
+def class_name(partition):
+    return "+".join(str(part) for part in partition)
+
+
+##---SIMULATION---##
+##----------------##
+def play_secret(secret, config):
+    # The game seeds are the same for every secret, so that the differences
+    # between secrets are not hidden by the noise of the random generator
+    games = [
+        MastermindGame(
+            target_length=len(secret),
+            population_size=config["population"],
+            mutation_rate=config["mutation"],
+            show_secret_code=False,
+            show_best=False,
+            consistency_mode=config["consistency"],
+            deduplicate=config["dedup"],
+            mutation_mode=config["mutation_mode"],
+            seed=config["seed"] + game,
+            secret=secret,
+        )
+        for game in range(config["games"])
+    ]
+
+    # All the games of the secret advance together, one generation per step
+    batch = GameBatch(games)
+    while len(batch):
+        batch.step()
+    return [game.generation for game in games]
+
+
+def play_chunk(task):
+    chunk, config = task
+    return [(secret, play_secret(secret, config)) for secret in chunk]
+
+
+def chunked(iterable, chunk_size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def difficulty_map(length, config, exhaustive=False, workers=None):
+    # Yields (secret, generations of each game) as the secrets are played
+    if exhaustive:
+        secrets = (list(secret) for secret in itertools.product(COLORS, repeat=length))
+    elif config["consistency"]:
+        secrets = (representative(partition) for partition in secret_classes(length))
+    else:
+        secrets = [representative(next(secret_classes(length)))]  # One class
+    tasks = ((chunk, config) for chunk in chunked(secrets, CHUNK_SIZE))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            yield from play_chunk(task)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        for results in pool.imap_unordered(play_chunk, tasks):
+            yield from results
+
+
+##---REPORT---##
+##------------##
+def print_report(class_stats, hardest, exhaustive, consistency, confidence):
+    print(
+        f"{'Classe':<16}{'Exemple':<44}{'Codes':>7}{'Parties':>9}"
+        f"{'Moyenne':>9}{'Ecart-type':>12}{'IC':>8}{'Max':>6}"
+    )
+    ranked_classes = sorted(
+        class_stats.items(), key=lambda item: item[1].mean, reverse=True
+    )
+    for partition, stats in ranked_classes:
+        name, size = class_name(partition), class_size(partition)
+        if not consistency and not exhaustive:
+            # The only secret played stands for all of them
+            name, size = "toutes", len(COLORS) ** sum(partition)
+        print(
+            f"{name:<16}{' '.join(representative(partition)):<44}"
+            f"{size:>7}{stats.count:>9}{stats.mean:>9.1f}"
+            f"{stats.stdev():>12.1f}{stats.half_width(confidence):>8.2f}"
+            f"{stats.max:>6}"
+        )
+
+    if not consistency:
+        print(
+            "\nSans le mode cohérence, tous les codes sont aussi difficiles : "
+            "les écarts entre codes ne sont que du bruit."
+        )
+        if not exhaustive:
+            return
+
+    # Without --exhaustive, each representative stands for its whole class
+    title = "Codes les plus difficiles" if exhaustive else "Classes les plus difficiles"
+    print(f"\n{title} :")
+    for rank, (mean, secret, half_width) in enumerate(sorted(hardest, reverse=True), 1):
+        print(
+            f"{rank:>3}. {' '.join(secret):<44}{class_name(secret_class(secret)):<16}"
+            f"{mean:>9.1f} ± {half_width:.2f}"
+        )
+
+
+##---COMMAND LINE---##
+##------------------##
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Classe les codes secrets selon leur difficulté"
+    )
+    parser.add_argument("--length", type=int, default=4, help="longueur du code")
+    parser.add_argument("--games", type=int, default=50, help="parties par code")
+    parser.add_argument(
+        "--exhaustive",
+        action="store_true",
+        help="joue les 6^L codes au lieu d'un code par classe",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="processus")
+    parser.add_argument("--output", default=None, help="fichier JSONL par code")
+    parser.add_argument("--population", type=int, default=8, help="taille population")
+    parser.add_argument("--mutation", type=int, default=80, help="mutation (%%)")
+    parser.add_argument(
+        "--mutation-mode", choices=list(MUTATION_MODES), default="fixed"
+    )
+    parser.add_argument(
+        "--consistency", action="store_true", help="mode cohérence (un essai par coup)"
+    )
+    parser.add_argument("--dedup", action="store_true", help="population sans doublons")
+    parser.add_argument("--seed", type=int, default=0, help="graine aléatoire")
+    args = parser.parse_args(argv)
+
+    config = {
+        "games": args.games,
+        "population": args.population,
+        "mutation": args.mutation,
+        "mutation_mode": args.mutation_mode,
+        "consistency": args.consistency,
+        "dedup": args.dedup,
+        "seed": args.seed,
+    }
+    output_file = open(args.output, "w") if args.output is not None else None
+
+    start = time.perf_counter()
+    class_stats = collections.defaultdict(RunningStats)
+    # Heap of the hardest secrets (mean, secret, half width), the easiest on top
+    hardest = []
+    for secret, generations in difficulty_map(
+        args.length, config, exhaustive=args.exhaustive, workers=args.workers
+    ):
+        stats = RunningStats()
+        for value in generations:
+            stats.push(value)
+            class_stats[secret_class(secret)].push(value)
+        entry = (stats.mean, tuple(secret), stats.half_width(EXPERIMENTS_CONFIDENCE))
+        if len(hardest) < HARDEST_SECRETS:
+            heapq.heappush(hardest, entry)
+        else:
+            heapq.heappushpop(hardest, entry)
+        if output_file is not None:
+            output_file.write(
+                json.dumps(
+                    {
+                        "secret": secret,
+                        "class": class_name(secret_class(secret)),
+                        "mean": stats.mean,
+                        "stdev": stats.stdev(),
+                        "generations": generations,
+                    }
+                )
+                + "\n"
+            )
+    if output_file is not None:
+        output_file.close()
+
+    print_report(
+        class_stats,
+        hardest,
+        args.exhaustive,
+        args.consistency,
+        EXPERIMENTS_CONFIDENCE,
+    )
+    games = sum(stats.count for stats in class_stats.values())
+    print(f"\n{games} parties en {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
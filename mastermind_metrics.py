@@ -0,0 +1,241 @@
+"""
+Live metrics of the Mastermind Genetic Algorithm experiments
+
+This code samples a running MastermindGame from a background thread and exposes
+its counters in the Prometheus text format, in a file rewritten atomically at
+each sample and/or on a local HTTP endpoint (GET /metrics).
+The hot loop is never touched: the thread only reads the counters the game
+already keeps (solved games, score evaluations, current generation).
+
+Usage: python mastermindv1_pygame.py experiments --metrics-port 9100
+"""
+
+##---IMPORTS---##
+##-------------##
+import http.server
+import os
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+##---CONSTANTS VARIABLES---##
+##-------------------------##
+METRICS_INTERVAL = 1.0  # seconds between two samples
+METRICS_HOST = "127.0.0.1"
+GENERATION_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+##---PROCESS MEASURES---##
+##----------------------##
+def resident_memory():
+    # Current resident set size in bytes, None if it cannot be read
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_memory():
+    # Peak resident set size in bytes (ru_maxrss is in kilobytes on Linux)
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+##---EXPORTER---##
+##--------------##
+class MetricsExporter:
+    def __init__(self, game, path=None, port=None, interval=METRICS_INTERVAL):
+        self.game = game
+        self.path = path
+        self.port = port
+        self.interval = interval
+        # Settings of the experiments, as labels of every metric
+        settings = {
+            "length": game.target_length,
+            "population": game.population_size,
+            "mutation": game.mutation_rate,
+            "mutation_mode": game.mutation_mode,
+            "consistency": int(game.consistency_mode),
+            "dedup": int(game.deduplicate),
+        }
+        self.labels = ",".join(f'{name}="{value}"' for name, value in settings.items())
+
+        # Counters, only updated by the sampling thread
+        self.seen_games = 0
+        self.solved_generations = 0
+        self.generations = 0
+        self.bucket_counts = [0] * len(GENERATION_BUCKETS)
+        self.last_sample = None  # (wall time, cpu time, generations, evaluations)
+        self.generations_rate, self.evaluations_rate, self.utilisation = 0.0, 0.0, 0.0
+        self.text = ""
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.server = None
+
+    def start(self):
+        self.sample()
+        if self.port is not None:
+            self.server = http.server.ThreadingHTTPServer(
+                (METRICS_HOST, self.port), MetricsHandler
+            )
+            self.server.exporter = self
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.thread.start()
+
+    def close(self):
+        # Last sample, so that the file holds the final counters
+        self.stop_event.set()
+        self.thread.join()
+        self.sample()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        game = self.game
+        solved = game.all_secrets_found
+        if len(solved) < self.seen_games:
+            # The experiments started again from scratch
+            self.seen_games = 0
+            self.solved_generations = 0
+            self.generations = 0
+            self.bucket_counts = [0] * len(GENERATION_BUCKETS)
+        for generations in solved[self.seen_games :]:
+            self.solved_generations += generations
+            for i, bound in enumerate(GENERATION_BUCKETS):
+                if generations <= bound:
+                    self.bucket_counts[i] += 1
+        self.seen_games = len(solved)
+
+        # The game being played counts in the generations already done. A game
+        # marked as found may not be in the solved list yet, the counter never
+        # goes back
+        current = 0 if game.found else game.generation
+        self.generations = max(self.generations, self.solved_generations + current)
+        generations = self.generations
+        evaluations = game.evaluations
+        now, cpu_time = time.monotonic(), time.process_time()
+        if self.last_sample is not None:
+            last_time, last_cpu_time, last_generations, last_evaluations = (
+                self.last_sample
+            )
+            elapsed = max(now - last_time, 1e-9)
+            self.generations_rate = max(generations - last_generations, 0) / elapsed
+            self.evaluations_rate = max(evaluations - last_evaluations, 0) / elapsed
+            self.utilisation = (cpu_time - last_cpu_time) / elapsed
+        self.last_sample = (now, cpu_time, generations, evaluations)
+
+        self.text = self.render(generations, evaluations)
+        if self.path is not None:
+            # Write to a temporary file then rename it, so a reader never sees
+            # a partial file
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as file:
+                file.write(self.text)
+            os.replace(tmp_path, self.path)
+
+    def render(self, generations, evaluations):
+        worker = f'{self.labels},pid="{os.getpid()}"'
+        lines = []
+
+        def metric(name, metric_type, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{{{labels}}} {value}")
+
+        metric(
+            "mastermind_games_completed_total",
+            "counter",
+            "Games solved by the experiments.",
+            [("", self.labels, self.seen_games)],
+        )
+        metric(
+            "mastermind_generations_total",
+            "counter",
+            "Generations played, including the current game.",
+            [("", self.labels, generations)],
+        )
+        metric(
+            "mastermind_evaluations_total",
+            "counter",
+            "Combinations scored.",
+            [("", self.labels, evaluations)],
+        )
+        metric(
+            "mastermind_generations_per_second",
+            "gauge",
+            "Generations played per second since the last sample.",
+            [("", self.labels, round(self.generations_rate, 1))],
+        )
+        metric(
+            "mastermind_evaluations_per_second",
+            "gauge",
+            "Combinations scored per second since the last sample.",
+            [("", self.labels, round(self.evaluations_rate, 1))],
+        )
+
+        # Cumulative buckets of the generations needed to solve a game
+        buckets = []
+        for bound, count in zip(GENERATION_BUCKETS, self.bucket_counts):
+            buckets.append(("_bucket", f'{self.labels},le="{bound}"', count))
+        buckets.append(("_bucket", f'{self.labels},le="+Inf"', self.seen_games))
+        buckets.append(("_sum", self.labels, self.solved_generations))
+        buckets.append(("_count", self.labels, self.seen_games))
+        metric(
+            "mastermind_generations_to_solve",
+            "histogram",
+            "Generations needed to solve a game.",
+            buckets,
+        )
+
+        metric(
+            "mastermind_worker_cpu_utilisation",
+            "gauge",
+            "CPU time of the worker process per second of wall time.",
+            [("", worker, round(self.utilisation, 3))],
+        )
+        resident, peak = resident_memory(), peak_memory()
+        if resident is not None:
+            metric(
+                "mastermind_worker_resident_memory_bytes",
+                "gauge",
+                "Resident memory of the worker process.",
+                [("", worker, resident)],
+            )
+        if peak is not None:
+            metric(
+                "mastermind_worker_peak_memory_bytes",
+                "gauge",
+                "Peak resident memory of the worker process.",
+                [("", worker, peak)],
+            )
+        return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.exporter.text.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # No line per scrape on the experiments output
+        pass
@@ -0,0 +1,379 @@
+"""
+Persistent pool of warm workers for the Mastermind Genetic Algorithm
+
+Starting a multiprocessing.Pool for every batch of games costs more than the
+games themselves when the batch is small: each worker starts an interpreter and
+imports the engines before playing. This server starts its workers once, lets
+them import the engines and play a short game, then keeps them waiting for the
+batches of the PyGame interface ("Lancer 200 Parties"), of the Tkinter interface
+("Run 200 Games") and of the command line.
+
+The workers never open a window: the engines only touch the display in their
+drawing code. Requests and responses are JSON lines on a local TCP socket:
+- {"op": "ping"}                          the time at which a worker answered
+- {"op": "experiments", "engine": "v1",   generations and CPU time of each game
+   "games", "length", "population", "mutation", "mutation_mode",
+   "consistency", "dedup", "seed"}
+The clients measure the dispatch latency, from the request being sent to the
+first game being started by a worker.
+
+Usage:
+    python mastermind_pool.py serve --workers 4
+    python mastermind_pool.py run --games 200 --length 5
+    python mastermind_pool.py ping --count 200
+"""
+
+##---IMPORTS---##
+##-------------##
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import socketserver
+import time
+
+# Pygame's greeting would be printed by every worker
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+##---CONSTANTS VARIABLES---##
+##-------------------------##
+HOST = "127.0.0.1"
+PORT = 8766
+CONNECT_TIMEOUT = 0.2  # seconds, the interfaces then play the games themselves
+CHUNK_GAMES = 25  # games sent to a worker at once, each chunk has its own seed
+MAX_POOL_GAMES = 100000
+ENGINES = ("v1", "v0")
+
+
+##---WORKERS---##
+##-------------##
+def warm_worker():
+    # Pool initializer: imports the engines and plays a short game of each, so
+    # that the first batch does not pay for it. Ctrl+C is left to the server,
+    # which stops the workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Here and below, the engines are imported when needed: the interfaces
+    # import this module, an import at the top would be circular
+    from mastermindv1_pygame import MastermindGame
+
+    MastermindGame(
+        target_length=2,
+        population_size=4,
+        mutation_rate=80,
+        show_secret_code=False,
+        show_best=False,
+        seed=0,
+    ).run_many_experiments(num_exp=1)
+    try:
+        import mastermindv0_tkinter
+    except ImportError:  # Tkinter is not always installed with Python
+        return
+    mastermindv0_tkinter.play_game(1, 4)
+
+
+def worker_time(_=None):
+    return time.time()
+
+
+def play_chunk(task):
+    # Returns (start time, generations, CPU times, duplicates and scores counters)
+    engine, parameters, games, seed = task
+    start = time.time()
+    counters = [0, 0, 0, 0]
+    if engine == "v0":
+        import mastermindv0_tkinter
+
+        random.seed(seed)
+        generations, cpu_times = [], []
+        for _ in range(games):
+            game_start = time.process_time()
+            generations.append(
+                mastermindv0_tkinter.play_game(
+                    parameters["length"], parameters["population"]
+                )
+            )
+            cpu_times.append(time.process_time() - game_start)
+    else:
+        from mastermind_server import new_game
+
+        game = new_game(parameters)
+        game.run_many_experiments(num_exp=games, seed=seed)
+        generations, cpu_times = game.all_secrets_found, game.all_cpu_times
+        counters = [
+            game.checked_genomes,
+            game.duplicates,
+            game.duplicates_replaced,
+            game.evaluations_avoided,
+        ]
+    return start, generations, cpu_times, counters
+
+
+def chunk_tasks(engine, parameters, games, seed):
+    # The chunks do not depend on the number of workers, so a seeded batch
+    # gives the same games on any pool
+    tasks = []
+    for index, first in enumerate(range(0, games, CHUNK_GAMES)):
+        chunk_seed = None if seed is None else seed + index
+        tasks.append((engine, parameters, min(CHUNK_GAMES, games - first), chunk_seed))
+    return tasks
+
+
+def merge_chunks(results):
+    response = {
+        "first_start": min(start for start, _, _, _ in results),
+        "generations": [],
+        "cpu_times": [],
+        "counters": [0, 0, 0, 0],
+    }
+    for _, generations, cpu_times, counters in results:
+        response["generations"] += generations
+        response["cpu_times"] += cpu_times
+        response["counters"] = [a + b for a, b in zip(response["counters"], counters)]
+    return response
+
+
+##---SERVER---##
+##------------##
+def parse_pool_request(request):
+    # Raises ValueError with a readable message on invalid parameters
+    from mastermind_server import parse_game_parameters
+    from mastermindv1_pygame import MUTATION_MODES
+
+    engine = request.get("engine", "v1")
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    games = int(request.get("games", 200))
+    if not 1 <= games <= MAX_POOL_GAMES:
+        raise ValueError(f"games must be between 1 and {MAX_POOL_GAMES}")
+    if engine == "v0":
+        # The Tkinter version has its own bounds, those of its start screen
+        import mastermindv0_tkinter as v0
+
+        length = int(request.get("length", 4))
+        population = int(request.get("population", 8))
+        if not v0.MIN_TARGET_LENGTH <= length <= v0.MAX_TARGET_LENGTH:
+            raise ValueError(
+                f"length must be between {v0.MIN_TARGET_LENGTH} "
+                f"and {v0.MAX_TARGET_LENGTH}"
+            )
+        if not v0.MIN_POPULATION_SIZE <= population <= v0.MAX_POPULATION_SIZE:
+            raise ValueError(
+                f"population must be between {v0.MIN_POPULATION_SIZE} "
+                f"and {v0.MAX_POPULATION_SIZE}"
+            )
+        seed = request.get("seed")
+        parameters = {"length": length, "population": population}
+        return engine, parameters, games, None if seed is None else int(seed)
+
+    parameters = parse_game_parameters(request)
+    seed = parameters.pop("seed")
+    parameters.pop("secret")
+    mutation_mode = request.get("mutation_mode", "fixed")
+    if mutation_mode not in MUTATION_MODES:
+        raise ValueError(f"mutation_mode must be one of {list(MUTATION_MODES)}")
+    parameters["mutation_mode"] = mutation_mode
+    return engine, parameters, games, seed
+
+
+class PoolServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, workers=None):
+        super().__init__(address, PoolRequestHandler)
+        parse_pool_request({})  # imports the engines before the first request
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = multiprocessing.Pool(self.workers, initializer=warm_worker)
+        # Waits for the workers to be warm before accepting any batch
+        self.pool.map(worker_time, range(self.workers), chunksize=1)
+
+    def dispatch(self, request):
+        op = request.get("op")
+        if op == "ping":
+            return {"first_start": self.pool.apply(worker_time)}
+        if op == "experiments":
+            tasks = chunk_tasks(*parse_pool_request(request))
+            response = merge_chunks(self.pool.map(play_chunk, tasks, chunksize=1))
+            response["workers"] = self.workers
+            return response
+        raise ValueError(f"unknown op {op!r}")
+
+    def server_close(self):
+        super().server_close()
+        self.pool.terminate()
+        self.pool.join()
+
+
+class PoolRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # One JSON response line per JSON request line, until the client leaves
+        for line in self.rfile:
+            try:
+                response = self.server.dispatch(json.loads(line))
+            except (ValueError, TypeError, AttributeError) as error:
+                response = {"error": str(error)}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+
+
+##---CLIENT---##
+##------------##
+class PoolClient:
+    # Raises OSError when no pool server is running
+    def __init__(self, host=HOST, port=PORT, timeout=CONNECT_TIMEOUT):
+        self.socket = socket.create_connection((host, port), timeout=timeout)
+        self.socket.settimeout(None)  # a batch can take long to play
+        self.file = self.socket.makefile("rwb")
+
+    def request(self, **request):
+        # Adds the dispatch latency and the round trip time to the response
+        sent = time.time()
+        self.file.write((json.dumps(request) + "\n").encode())
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("the pool server closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise ValueError(response["error"])
+        response["elapsed"] = time.time() - sent
+        response["dispatch"] = response["first_start"] - sent
+        return response
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def pooled_experiments(engine, parameters, games, seed=None, host=HOST, port=PORT):
+    # Plays the games on the pool server, raises OSError when it is not running
+    with PoolClient(host, port) as client:
+        return client.request(
+            op="experiments", engine=engine, games=games, seed=seed, **parameters
+        )
+
+
+def cold_experiments(engine, parameters, games, seed=None, workers=None):
+    # Same batch on a pool started for it, to compare with the warm pool
+    sent = time.time()
+    request = dict(parameters, engine=engine, games=games, seed=seed)
+    tasks = chunk_tasks(*parse_pool_request(request))
+    with multiprocessing.Pool(workers, initializer=warm_worker) as pool:
+        response = merge_chunks(pool.map(play_chunk, tasks, chunksize=1))
+    response["elapsed"] = time.time() - sent
+    response["dispatch"] = response["first_start"] - sent
+    return response
+
+
+##---COMMAND LINE---##
+##------------------##
+def print_batch(title, response):
+    from mastermindv1_pygame import RunningStats
+
+    stats = RunningStats()
+    for generations in response["generations"]:
+        stats.push(generations)
+    print(
+        f"{title:<14}{stats.count:>8}{stats.mean:>10.1f}{stats.min:>6}{stats.max:>7}"
+        f"{1000 * response['dispatch']:>16.1f}{response['elapsed']:>11.2f}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pool de processus prêts à jouer, partagé par les interfaces"
+    )
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="démarre le pool")
+    serve.add_argument("--workers", type=int, default=None, help="processus")
+
+    run = subparsers.add_parser("run", help="joue des parties sur le pool")
+    run.add_argument("--engine", choices=ENGINES, default="v1")
+    run.add_argument("--games", type=int, default=200, help="nombre de parties")
+    run.add_argument("--length", type=int, default=4, help="longueur du code")
+    run.add_argument("--population", type=int, default=8, help="taille population")
+    run.add_argument("--mutation", type=int, default=80, help="mutation (%%)")
+    run.add_argument("--mutation-mode", default="fixed")
+    run.add_argument(
+        "--consistency", action="store_true", help="mode cohérence (un essai par coup)"
+    )
+    run.add_argument("--dedup", action="store_true", help="population sans doublons")
+    run.add_argument("--seed", type=int, default=None, help="graine aléatoire")
+    run.add_argument(
+        "--cold",
+        action="store_true",
+        help="rejoue les mêmes parties sur un pool démarré pour l'occasion",
+    )
+
+    ping = subparsers.add_parser("ping", help="mesure la latence de lancement")
+    ping.add_argument("--count", type=int, default=100, help="nombre de requêtes")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        with PoolServer((args.host, args.port), args.workers) as server:
+            print(
+                f"Pool de {server.workers} processus prêt sur {args.host}:{args.port}"
+            )
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+    elif args.command == "run":
+        parameters = {
+            "length": args.length,
+            "population": args.population,
+            "mutation": args.mutation,
+            "mutation_mode": args.mutation_mode,
+            "consistency": args.consistency,
+            "dedup": args.dedup,
+        }
+        try:
+            response = pooled_experiments(
+                args.engine, parameters, args.games, args.seed, args.host, args.port
+            )
+        except OSError:
+            parser.error(
+                f"aucun pool sur {args.host}:{args.port}, lancer d'abord serve"
+            )
+        except ValueError as error:
+            parser.error(str(error))
+        print(
+            f"{'Pool':<14}{'Parties':>8}{'Moyenne':>10}{'Min':>6}{'Max':>7}"
+            f"{'Lancement (ms)':>16}{'Total (s)':>11}"
+        )
+        print_batch("Permanent", response)
+        if args.cold:
+            print_batch(
+                "Nouveau",
+                cold_experiments(args.engine, parameters, args.games, args.seed),
+            )
+    else:
+        from mastermind_server import percentile
+
+        dispatches, round_trips = [], []
+        with PoolClient(args.host, args.port) as client:
+            for _ in range(args.count):
+                response = client.request(op="ping")
+                dispatches.append(1000 * response["dispatch"])
+                round_trips.append(1000 * response["elapsed"])
+        for name, values in [("Lancement", dispatches), ("Aller-retour", round_trips)]:
+            values.sort()
+            print(
+                f"{name} (ms) : p50 {percentile(values, 50):.2f}, "
+                f"p99 {percentile(values, 99):.2f}, max {values[-1]:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Differential check of the scoring engines of the Mastermind Genetic Algorithm
+
+Every scoring engine registered here must give exactly the same score as the
+reference score_combination of the PyGame version, for every (guess, secret)
+pair. The pairs of the small lengths are all enumerated, those of the larger
+lengths are sampled at random. Each engine is checked in the two modes of the
+reference: exact matches only, and exact plus partial matches.
+
+On a mismatch, the smallest counterexample found is printed (shortest code,
+then first colors in the order of COLORS) and the exit status is 1.
+For each engine, the time taken on the same pairs as the reference gives its
+speedup over the reference.
+
+The Tkinter version scores with PARTIAL_MATCH = 0, which is the exact-only mode
+of the PyGame version: it is only registered in that mode.
+"""
+
+##---IMPORTS---##
+##-------------##
+import argparse
+import itertools
+import operator
+import os
+import random
+import sys
+import time
+from functools import lru_cache
+
+# Pygame's greeting would be mixed with the table written on stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from mastermindv1_pygame import (  # noqa: E402
+    COLOR_INDEX,
+    COLORS,
+    EXACT_MATCH,
+    PARTIAL_MATCH,
+    cached_feedback,
+    match_counts,
+    pack_combination,
+    score_combination,
+)
+
+try:
+    import mastermindv0_tkinter  # noqa: E402
+except ImportError:  # Tkinter is not always installed with Python
+    mastermindv0_tkinter = None
+
+##---CONSTANTS VARIABLES---##
+##-------------------------##
+MODES = {"exact": True, "partial": False}  # name: exact_only
+EXHAUSTIVE_LENGTH = 3  # longest code for which every pair is checked
+SAMPLED_PAIRS = 20000  # pairs checked for the longer codes
+PACKED_TABLE_LENGTH = 4  # longest code of the precomputed feedback tables
+
+# name: (function(guess, secret, exact_only), modes, longest code or None)
+SCORERS = {}
+
+
+def register_scorer(name, modes=tuple(MODES), max_length=None):
+    def register(function):
+        SCORERS[name] = (function, modes, max_length)
+        return function
+
+    return register
+
+
+##---SCORING ENGINES---##
+##---------------------##
+@register_scorer("counts")
+def score_counts(combination, target, exact_only=True):
+    # match_counts counts the common colors on the whole codes, then removes
+    # the exact matches
+    exact_match, partial_match = match_counts(combination, target)
+    if exact_only:
+        return exact_match * EXACT_MATCH
+    return exact_match * EXACT_MATCH + partial_match * PARTIAL_MATCH
+
+
+@lru_cache(maxsize=None)
+def packed_table(length):
+    # Exact and partial matches of every pair of codes of the given length, at
+    # index pack(guess) * 6^length + pack(secret), as exact * (length + 1) + partial
+    codes = list(itertools.product(range(len(COLORS)), repeat=length))
+    counts = [[code.count(color) for color in range(len(COLORS))] for code in codes]
+    table = bytearray(len(codes) ** 2)
+    index = 0
+    for guess, guess_counts in zip(codes, counts):
+        for secret, secret_counts in zip(codes, counts):
+            exact_match = sum(map(operator.eq, guess, secret))
+            common = sum(map(min, guess_counts, secret_counts))
+            table[index] = exact_match * (length + 1) + common - exact_match
+            index += 1
+    return table
+
+
+@register_scorer("packed", max_length=PACKED_TABLE_LENGTH)
+def score_packed(combination, target, exact_only=True):
+    length = len(combination)
+    feedback = packed_table(length)[
+        pack_combination(combination) * len(COLORS) ** length + pack_combination(target)
+    ]
+    exact_match, partial_match = divmod(feedback, length + 1)
+    if exact_only:
+        return exact_match * EXACT_MATCH
+    return exact_match * EXACT_MATCH + partial_match * PARTIAL_MATCH
+
+
+@register_scorer("cached", modes=("partial",))
+def score_cached(combination, target, exact_only=False):
+    # The consistency mode compares these feedbacks, always with partial matches
+    exact_match, partial_match = cached_feedback(tuple(combination), tuple(target))
+    return exact_match * EXACT_MATCH + partial_match * PARTIAL_MATCH
+
+
+if mastermindv0_tkinter is not None:
+
+    @register_scorer("v0", modes=("exact",))
+    def score_v0(combination, target, exact_only=True):
+        return mastermindv0_tkinter.score_combination(combination, target)
+
+
+##---PAIRS---##
+##-----------##
+def all_pairs(length):
+    # Every (guess, secret) pair, in the order of COLORS
+    codes = list(itertools.product(COLORS, repeat=length))
+    return [(guess, secret) for guess in codes for secret in codes]
+
+
+def sampled_pairs(length, count, rng):
+    # Half of the secrets are the guess with a few colors changed, so that the
+    # pairs with many exact matches are not missed on long codes
+    pairs = []
+    for i in range(count):
+        guess = tuple(rng.choice(COLORS) for _ in range(length))
+        if i % 2:
+            secret = list(guess)
+            for position in rng.sample(range(length), rng.randint(1, length)):
+                secret[position] = rng.choice(COLORS)
+            secret = tuple(secret)
+        else:
+            secret = tuple(rng.choice(COLORS) for _ in range(length))
+        pairs.append((guess, secret))
+    return pairs
+
+
+def pair_key(pair):
+    guess, secret = pair
+    return len(guess), [COLOR_INDEX[color] for color in guess + secret]
+
+
+def shrink(scorer, pair, exact_only):
+    # Smaller pair on which the scorer still disagrees with the reference:
+    # positions are removed and colors replaced by earlier ones while possible
+    def disagrees(guess, secret):
+        return scorer(guess, secret, exact_only) != score_combination(
+            guess, secret, exact_only
+        )
+
+    guess, secret = pair
+    shrinking = True
+    while shrinking:
+        shrinking = False
+        candidates = [
+            (guess[:i] + guess[i + 1 :], secret[:i] + secret[i + 1 :])
+            for i in range(len(guess))
+            if len(guess) > 1
+        ]
+        for code, i in itertools.product((0, 1), range(len(guess))):
+            for color in COLORS[: COLOR_INDEX[(guess, secret)[code][i]]]:
+                codes = [list(guess), list(secret)]
+                codes[code][i] = color
+                candidates.append((tuple(codes[0]), tuple(codes[1])))
+        for candidate in candidates:
+            if disagrees(*candidate):
+                guess, secret = candidate
+                shrinking = True
+                break
+    return guess, secret
+
+
+##---CHECK---##
+##-----------##
+def run_scorer(scorer, pairs, exact_only):
+    start = time.perf_counter()
+    scores = [scorer(guess, secret, exact_only) for guess, secret in pairs]
+    return scores, time.perf_counter() - start
+
+
+def check_length(pairs, scorers, modes):
+    # Yields (name, mode, smallest counterexample or None, time, reference time)
+    for mode in modes:
+        exact_only = MODES[mode]
+        expected, reference_time = run_scorer(score_combination, pairs, exact_only)
+        for name, scorer, scorer_modes in scorers:
+            if mode not in scorer_modes:
+                continue
+            if name == "cached":
+                # A warm cache would make the timing depend on the order of the checks
+                cached_feedback.cache_clear()
+            scores, elapsed = run_scorer(scorer, pairs, exact_only)
+            mismatches = [
+                pair
+                for pair, score, reference in zip(pairs, scores, expected)
+                if score != reference
+            ]
+            counterexample = None
+            if mismatches:
+                counterexample = min(
+                    (shrink(scorer, pair, exact_only) for pair in mismatches[:100]),
+                    key=pair_key,
+                )
+            yield name, mode, counterexample, elapsed, reference_time
+
+
+##---COMMAND LINE---##
+##------------------##
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare les moteurs de score au score de référence"
+    )
+    parser.add_argument(
+        "--lengths",
+        type=int,
+        nargs="+",
+        default=list(range(1, 9)),
+        help="longueurs de code vérifiées",
+    )
+    parser.add_argument(
+        "--exhaustive-length",
+        type=int,
+        default=EXHAUSTIVE_LENGTH,
+        help="longueur maximale pour laquelle toutes les paires sont vérifiées",
+    )
+    parser.add_argument(
+        "--pairs",
+        type=int,
+        default=SAMPLED_PAIRS,
+        help="paires tirées au hasard au-delà",
+    )
+    parser.add_argument(
+        "--scorers",
+        nargs="+",
+        choices=list(SCORERS),
+        default=list(SCORERS),
+        help="moteurs vérifiés",
+    )
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--seed", type=int, default=0, help="graine aléatoire")
+    args = parser.parse_args(argv)
+
+    if mastermindv0_tkinter is None:
+        print("Tkinter indisponible : le moteur v0 n'est pas vérifié")
+    rng = random.Random(args.seed)
+    failures = {}  # (name, mode): smallest counterexample
+    print(
+        f"{'Longueur':<10}{'Paires':>16}{'Moteur':>10}{'Mode':>9}"
+        f"{'Résultat':>10}{'Temps (ms)':>12}{'Accélération':>14}"
+    )
+    for length in sorted(args.lengths):
+        if length <= args.exhaustive_length:
+            pairs = all_pairs(length)
+            pairs_name = f"{len(pairs)} (toutes)"
+        else:
+            pairs = sampled_pairs(length, args.pairs, rng)
+            pairs_name = str(len(pairs))
+        scorers = []
+        for name in args.scorers:
+            scorer, scorer_modes, max_length = SCORERS[name]
+            if max_length is not None and length > max_length:
+                continue
+            if name == "packed":
+                packed_table(length)  # built once, out of the timing
+            scorers.append((name, scorer, scorer_modes))
+
+        for name, mode, counterexample, elapsed, reference_time in check_length(
+            pairs, scorers, args.modes
+        ):
+            print(
+                f"{length:<10}{pairs_name:>16}{name:>10}{mode:>9}"
+                f"{'OK' if counterexample is None else 'ÉCHEC':>10}"
+                f"{elapsed * 1000:>12.1f}{reference_time / max(elapsed, 1e-9):>13.2f}x"
+            )
+            if counterexample is not None:
+                smallest = failures.get((name, mode))
+                if smallest is None or pair_key(counterexample) < pair_key(smallest):
+                    failures[(name, mode)] = counterexample
+
+    for (name, mode), (guess, secret) in sorted(failures.items()):
+        exact_only = MODES[mode]
+        print(
+            f"\nContre-exemple pour {name} ({mode}) :\n"
+            f"  essai  : {' '.join(guess)}\n"
+            f"  secret : {' '.join(secret)}\n"
+            f"  référence : {score_combination(guess, secret, exact_only)}, "
+            f"{name} : {SCORERS[name][0](guess, secret, exact_only)}"
+        )
+    if failures:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
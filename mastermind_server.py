@@ -0,0 +1,479 @@
+"""
+Local solve service for the Mastermind Genetic Algorithm
+
+This code exposes the MastermindGame engine to other processes of the same host,
+through a small asyncio HTTP/WebSocket server. Concurrent requests are coalesced
+into one GameBatch, so that all the running games advance together.
+
+Endpoints:
+- POST /solve        {"length", "population", "mutation", "secret", "seed", ...}
+- POST /experiments  same parameters and "games"
+- GET  /metrics      latencies (p50 / p99) and throughput
+- GET  /ws           WebSocket, send the parameters of a solve, receive every
+                     generation then the result
+
+A load generator is bundled: python mastermind_server.py loadgen
+"""
+
+##---IMPORTS---##
+##-------------##
+import argparse
+import asyncio
+import base64
+import collections
+import hashlib
+import json
+import random
+import struct
+import time
+
+from mastermindv1_pygame import (
+    COLORS,
+    MIN_POPULATION_SIZE,
+    MAX_POPULATION_SIZE,
+    MIN_TARGET_LENGTH,
+    MAX_TARGET_LENGTH,
+    GameBatch,
+    MastermindGame,
+    RunningStats,
+)
+
+##---CONSTANTS VARIABLES---##
+##-------------------------##
+HOST = "127.0.0.1"
+PORT = 8765
+BATCH_WINDOW = 0.002  # seconds waited for other requests before stepping a batch
+MAX_GENERATIONS = 100000  # a game still running after that is abandoned
+MAX_EXPERIMENTS_GAMES = 10000
+LATENCY_WINDOW = 10000  # latest request latencies kept for the percentiles
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+##---GAME PARAMETERS---##
+##---------------------##
+def parse_game_parameters(params):
+    # Raises ValueError with a readable message on invalid parameters
+    if not isinstance(params, dict):
+        raise ValueError("parameters must be a JSON object")
+    length = int(params.get("length", 4))
+    population = int(params.get("population", 8))
+    mutation = float(params.get("mutation", 80))
+    if not MIN_TARGET_LENGTH <= length <= MAX_TARGET_LENGTH:
+        raise ValueError(
+            f"length must be between {MIN_TARGET_LENGTH} and {MAX_TARGET_LENGTH}"
+        )
+    if not MIN_POPULATION_SIZE <= population <= MAX_POPULATION_SIZE:
+        raise ValueError(
+            f"population must be between {MIN_POPULATION_SIZE} "
+            f"and {MAX_POPULATION_SIZE}"
+        )
+    if not 0 <= mutation <= 100:
+        raise ValueError("mutation must be a percentage")
+    secret = params.get("secret")
+    if secret is not None:
+        if len(secret) != length or any(color not in COLORS for color in secret):
+            raise ValueError(f"secret must be {length} colors among {COLORS}")
+    seed = params.get("seed")
+    return {
+        "target_length": length,
+        "population_size": population,
+        "mutation_rate": mutation,
+        "consistency_mode": bool(params.get("consistency", False)),
+        "deduplicate": bool(params.get("dedup", False)),
+        "seed": None if seed is None else int(seed),
+        "secret": secret,
+    }
+
+
+def new_game(parameters, seed=None, secret=None):
+    return MastermindGame(
+        show_secret_code=False,
+        show_best=False,
+        **dict(parameters, seed=seed, secret=secret),
+    )
+
+
+##---BATCHED ENGINE---##
+##--------------------##
+class SolveEngine:
+    # Single task stepping every running game of every request together
+    def __init__(self):
+        self.batch = GameBatch()
+        self.waiters = {}  # dict {game: (future, progress queue or None)}
+        self.wakeup = asyncio.Event()
+        self.batch_sizes = RunningStats()
+
+    def submit(self, game, progress=None):
+        future = asyncio.get_running_loop().create_future()
+        self.batch.add(game)
+        self.waiters[game] = (future, progress)
+        self.wakeup.set()
+        return future
+
+    def finish(self, game):
+        future, progress = self.waiters.pop(game)
+        if progress is not None:
+            progress.put_nowait(None)
+        if not future.done():
+            future.set_result(game)
+
+    async def run(self):
+        while True:
+            if not self.batch:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                # Lets the other pending requests join the same batch
+                await asyncio.sleep(BATCH_WINDOW)
+
+            self.batch_sizes.push(len(self.batch))
+            for game in self.batch.step():
+                self.finish(game)
+            for game in list(self.batch.games):
+                progress = self.waiters[game][1]
+                if progress is not None:
+                    progress.put_nowait(
+                        {
+                            "generation": game.generation,
+                            "best": max(game.scores.values()),
+                        }
+                    )
+                if game.generation >= MAX_GENERATIONS:
+                    self.batch.remove(game)
+                    self.finish(game)
+
+            # Gives the hand back to the network between two steps
+            await asyncio.sleep(0)
+
+
+def game_result(game, start):
+    return {
+        "secret": game.target_combination,
+        "found": game.found,
+        "generations": game.generation,
+        "evaluations": game.evaluations,
+        "wall_time": round(time.perf_counter() - start, 6),
+    }
+
+
+##---HTTP AND WEBSOCKET SERVER---##
+##-------------------------------##
+class SolveServer:
+    def __init__(self):
+        self.engine = SolveEngine()
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.completed = 0
+        self.games_completed = 0
+        self.started = time.perf_counter()
+
+    async def solve(self, params, progress=None):
+        return await self.solve_parameters(parse_game_parameters(params), progress)
+
+    async def solve_parameters(self, parameters, progress=None):
+        start = time.perf_counter()
+        game = new_game(parameters, parameters["seed"], parameters["secret"])
+        await self.engine.submit(game, progress)
+        self.games_completed += 1
+        return game_result(game, start)
+
+    async def experiments(self, params):
+        parameters = parse_game_parameters(params)
+        games = int(params.get("games", 200))
+        if not 1 <= games <= MAX_EXPERIMENTS_GAMES:
+            raise ValueError(f"games must be between 1 and {MAX_EXPERIMENTS_GAMES}")
+
+        # Each game gets its own seed drawn from the request seed
+        rng = random.Random(parameters["seed"])
+        start = time.perf_counter()
+        finished = await asyncio.gather(
+            *[
+                self.engine.submit(
+                    new_game(parameters, rng.getrandbits(64), parameters["secret"])
+                )
+                for _ in range(games)
+            ]
+        )
+        self.games_completed += games
+        stats = RunningStats()
+        for game in finished:
+            stats.push(game.generation)
+        return {
+            "games": games,
+            "min": stats.min,
+            "max": stats.max,
+            "mean": stats.mean,
+            "stdev": stats.stdev(),
+            "evaluations": sum(game.evaluations for game in finished),
+            "wall_time": round(time.perf_counter() - start, 6),
+        }
+
+    def metrics(self):
+        latencies = sorted(self.latencies)
+        elapsed = time.perf_counter() - self.started
+        return {
+            "requests": self.completed,
+            "games": self.games_completed,
+            "requests_per_second": self.completed / elapsed,
+            "games_per_second": self.games_completed / elapsed,
+            "latency_p50": percentile(latencies, 50),
+            "latency_p99": percentile(latencies, 99),
+            "mean_batch_size": self.engine.batch_sizes.mean,
+            "running_games": len(self.engine.batch),
+        }
+
+    async def handle_connection(self, reader, writer):
+        start = time.perf_counter()
+        try:
+            method, path, headers, body = await read_http_request(reader)
+            if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self.handle_websocket(reader, writer, headers)
+                return
+            if method == "GET" and path == "/metrics":
+                status, response = 200, self.metrics()
+            elif method == "POST" and path in ("/solve", "/experiments"):
+                params = json.loads(body or b"{}")
+                if path == "/solve":
+                    response = await self.solve(params)
+                else:
+                    response = await self.experiments(params)
+                status = 200
+                self.completed += 1
+                self.latencies.append(time.perf_counter() - start)
+            else:
+                status, response = 404, {"error": "unknown endpoint"}
+        except (ValueError, TypeError) as error:
+            status, response = 400, {"error": str(error)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        write_http_response(writer, status, response)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def handle_websocket(self, reader, writer, headers):
+        # Raised before the upgrade, so the client gets a 400 response
+        key = headers.get("sec-websocket-key")
+        if key is None:
+            raise ValueError("missing Sec-WebSocket-Key header")
+        accept = base64.b64encode(
+            hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()
+        ).decode()
+        writer.write(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode()
+        )
+
+        # One solve per message, every generation is streamed back
+        try:
+            while True:
+                message = await read_websocket_message(reader)
+                if message is None:
+                    break
+                start = time.perf_counter()
+                progress = asyncio.Queue()
+                try:
+                    # Checked before the task starts: a task failing before its
+                    # game is submitted would never end the progress stream
+                    parameters = parse_game_parameters(json.loads(message))
+                    task = asyncio.ensure_future(
+                        self.solve_parameters(parameters, progress)
+                    )
+                    while True:
+                        update = await progress.get()
+                        if update is None:
+                            break
+                        writer.write(websocket_frame(json.dumps(update)))
+                        await writer.drain()
+                    response = await task
+                    self.completed += 1
+                    self.latencies.append(time.perf_counter() - start)
+                except (ValueError, TypeError) as error:
+                    response = {"error": str(error)}
+                writer.write(websocket_frame(json.dumps(response)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        engine_task = asyncio.ensure_future(self.engine.run())
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serveur Mastermind sur http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            engine_task.cancel()
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))
+    return sorted_values[index]
+
+
+async def read_http_request(reader):
+    request_line = (await reader.readuntil(b"\r\n")).decode().split()
+    if len(request_line) != 3:
+        raise ValueError("malformed request")
+    method, path, _ = request_line
+    headers = {}
+    while True:
+        line = (await reader.readuntil(b"\r\n")).decode().strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return method, path.split("?")[0], headers, body
+
+
+def write_http_response(writer, status, response):
+    body = json.dumps(response).encode()
+    reason = {200: "OK", 400: "Bad Request", 404: "Not Found"}[status]
+    writer.write(
+        (
+            f"HTTP/1.1 {status} {reason}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode()
+        + body
+    )
+
+
+async def read_websocket_message(reader):
+    # Text message sent by a client (masked frames), None when it closes
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    mask = await reader.readexactly(4) if second & 0x80 else b"\0\0\0\0"
+    payload = await reader.readexactly(length)
+    if opcode == 0x8:
+        return None
+    return bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload)).decode()
+
+
+def websocket_frame(text, mask=False):
+    # Single text frame, clients must mask what they send
+    payload = text.encode()
+    header = bytearray([0x81])
+    mask_bit = 0x80 if mask else 0
+    if len(payload) < 126:
+        header.append(mask_bit | len(payload))
+    elif len(payload) < 2**16:
+        header.append(mask_bit | 126)
+        header += struct.pack("!H", len(payload))
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack("!Q", len(payload))
+    if mask:
+        key = random.getrandbits(32).to_bytes(4, "big")
+        header += key
+        payload = bytes(byte ^ key[i % 4] for i, byte in enumerate(payload))
+    return bytes(header) + payload
+
+
+##---LOAD GENERATOR---##
+##--------------------##
+async def post(host, port, path, params):
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(params).encode()
+    writer.write(
+        (
+            f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode()
+        + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+async def get(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+async def load_generator(host, port, clients, requests, params):
+    # Each client sends its solve requests one after the other
+    latencies = []
+    per_client = [
+        requests // clients + (i < requests % clients) for i in range(clients)
+    ]
+
+    async def client(count, client_id):
+        for i in range(count):
+            start = time.perf_counter()
+            await post(
+                host, port, "/solve", dict(params, seed=client_id * requests + i)
+            )
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client(count, i) for i, count in enumerate(per_client)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(
+        f"{requests} requêtes en {elapsed:.2f} s ({requests / elapsed:.1f} requêtes/s)"
+    )
+    print(
+        f"Latence client p50 : {percentile(latencies, 50) * 1000:.1f} ms, "
+        f"p99 : {percentile(latencies, 99) * 1000:.1f} ms"
+    )
+    print(
+        "Métriques serveur :", json.dumps(await get(host, port, "/metrics"), indent=2)
+    )
+
+
+##---COMMAND LINE---##
+##------------------##
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service local de résolution")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("serve", help="lance le serveur (par défaut)")
+    loadgen = subparsers.add_parser("loadgen", help="envoie des requêtes au serveur")
+    loadgen.add_argument("--clients", type=int, default=50)
+    loadgen.add_argument("--requests", type=int, default=1000)
+    loadgen.add_argument("--length", type=int, default=4)
+    loadgen.add_argument("--population", type=int, default=8)
+    loadgen.add_argument("--mutation", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.command == "loadgen":
+        params = {
+            "length": args.length,
+            "population": args.population,
+            "mutation": args.mutation,
+        }
+        asyncio.run(
+            load_generator(args.host, args.port, args.clients, args.requests, params)
+        )
+    else:
+        try:
+            asyncio.run(SolveServer().serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
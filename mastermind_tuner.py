@@ -0,0 +1,202 @@
+"""
+Successive halving tuner for the Mastermind Genetic Algorithm
+
+This code looks for the population size and mutation rate which solve the codes
+of a given length in the fewest generations. Every candidate first plays a few
+games, the worst candidates are discarded, and the survivors play more games,
+until a single configuration remains. Its parameters are written to a JSON file,
+which the start screen of the PyGame version loads as default settings.
+"""
+
+##---IMPORTS---##
+##-------------##
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+# Pygame's greeting would be mixed with the results written on stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from mastermindv1_pygame import (  # noqa: E402
+    MAX_MUTATION_RATE,
+    MAX_POPULATION_SIZE,
+    MIN_POPULATION_SIZE,
+    MUTATION_MODES,
+    TUNED_PARAMETERS_PATH,
+    MastermindGame,
+)
+
+##---CONSTANTS VARIABLES---##
+##-------------------------##
+MIN_GAMES = 4  # games played by every candidate at the first rung
+HALVING_RATE = 3  # only the best 1/HALVING_RATE candidates go to the next rung
+MUTATION_STEP = 5  # percentage, a null rate could never solve some codes
+
+
+##---SUCCESSIVE HALVING---##
+##------------------------##
+def play_candidate(task):
+    # Generations of each game of a candidate, the same seed for all candidates
+    candidate, length, games, seed, options = task
+    population_size, mutation_rate, mutation_mode = candidate
+    game = MastermindGame(
+        target_length=length,
+        population_size=population_size,
+        mutation_rate=mutation_rate,
+        show_secret_code=False,
+        show_best=False,
+        consistency_mode=options["consistency"],
+        deduplicate=options["dedup"],
+        mutation_mode=mutation_mode,
+    )
+    game.run_many_experiments(num_exp=games, seed=seed)
+    return game.all_secrets_found
+
+
+def successive_halving(
+    candidates,
+    length,
+    options,
+    min_games=MIN_GAMES,
+    halving_rate=HALVING_RATE,
+    seed=0,
+    workers=None,
+):
+    # Yields (rung, games per candidate, [(mean, candidate, games played), ...])
+    # for each rung, best candidates first. The games of a rung are added to
+    # those of the previous rungs, and each rung has its own seed
+    totals = {candidate: [0, 0] for candidate in candidates}  # [sum, count]
+    games = min_games
+    rung = 0
+    with multiprocessing.Pool(workers) as pool:
+        while True:
+            tasks = [
+                (candidate, length, games, seed + rung, options)
+                for candidate in candidates
+            ]
+            for candidate, generations in zip(
+                candidates, pool.map(play_candidate, tasks, chunksize=1)
+            ):
+                totals[candidate][0] += sum(generations)
+                totals[candidate][1] += len(generations)
+            ranking = sorted(
+                (total / count, candidate, count)
+                for candidate, (total, count) in totals.items()
+                if candidate in candidates
+            )
+            yield rung, games, ranking
+            if len(ranking) == 1:
+                return
+            kept = max(1, len(ranking) // halving_rate)
+            candidates = [candidate for _, candidate, _ in ranking[:kept]]
+            games *= halving_rate
+            rung += 1
+
+
+##---COMMAND LINE---##
+##------------------##
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Cherche la taille de population et le taux de mutation "
+        "qui résolvent le code en le moins de générations"
+    )
+    parser.add_argument("--length", type=int, default=4, help="longueur du code")
+    parser.add_argument(
+        "--populations",
+        type=int,
+        nargs="+",
+        default=list(range(MIN_POPULATION_SIZE, MAX_POPULATION_SIZE + 1)),
+        help="tailles de population essayées",
+    )
+    parser.add_argument(
+        "--rates",
+        type=int,
+        nargs="+",
+        default=list(range(MUTATION_STEP, MAX_MUTATION_RATE + 1, MUTATION_STEP)),
+        help="taux de mutation essayés (%%)",
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=list(MUTATION_MODES),
+        default=["fixed"],
+        help="modes de mutation essayés",
+    )
+    parser.add_argument(
+        "--min-games", type=int, default=MIN_GAMES, help="parties au premier tour"
+    )
+    parser.add_argument(
+        "--halving-rate",
+        type=int,
+        default=HALVING_RATE,
+        help="seul le meilleur 1/N des configurations passe au tour suivant",
+    )
+    parser.add_argument(
+        "--consistency", action="store_true", help="mode cohérence (un essai par coup)"
+    )
+    parser.add_argument("--dedup", action="store_true", help="population sans doublons")
+    parser.add_argument("--seed", type=int, default=0, help="graine aléatoire")
+    parser.add_argument("--workers", type=int, default=None, help="processus")
+    parser.add_argument(
+        "--output",
+        default=TUNED_PARAMETERS_PATH,
+        help="fichier JSON des paramètres retenus",
+    )
+    args = parser.parse_args(argv)
+    if args.halving_rate < 2:
+        parser.error("--halving-rate doit valoir au moins 2")
+    if args.min_games < 1:
+        parser.error("--min-games doit valoir au moins 1")
+
+    # A value given twice would play its candidate twice per rung
+    candidates = [
+        (population_size, mutation_rate, mutation_mode)
+        for population_size in dict.fromkeys(args.populations)
+        for mutation_rate in dict.fromkeys(args.rates)
+        for mutation_mode in dict.fromkeys(args.modes)
+    ]
+    options = {"consistency": args.consistency, "dedup": args.dedup}
+
+    start = time.perf_counter()
+    total_games = 0
+    for rung, games, ranking in successive_halving(
+        candidates,
+        args.length,
+        options,
+        min_games=args.min_games,
+        halving_rate=args.halving_rate,
+        seed=args.seed,
+        workers=args.workers,
+    ):
+        total_games += games * len(ranking)
+        mean, (population_size, mutation_rate, mutation_mode), played = ranking[0]
+        print(
+            f"Tour {rung + 1} : {len(ranking)} configurations, "
+            f"{games} parties chacune, meilleure : population {population_size}, "
+            f"mutation {mutation_rate} % ({MUTATION_MODES[mutation_mode]}), "
+            f"{mean:.1f} générations"
+        )
+
+    parameters = {
+        "target_length": args.length,
+        "population_size": population_size,
+        "mutation_rate": mutation_rate,
+        "mutation_mode": mutation_mode,
+        "consistency_mode": args.consistency,
+        "deduplicate": args.dedup,
+        "mean_generations": round(mean, 2),
+        "games": played,
+        "seed": args.seed,
+    }
+    with open(args.output, "w") as file:
+        json.dump(parameters, file, indent=2)
+    print(
+        f"{total_games} parties en {time.perf_counter() - start:.1f} s, "
+        f"paramètres écrits dans {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,20 @@
 import random
+import statistics
+import time
 import tkinter as tk
 from collections import Counter
 from tkinter import messagebox
 
+from mastermind_pool import pooled_experiments
+
 COLORS = ["Red", "Blue", "Green", "Yellow", "Black", "White"]
 MUTATION_RATE = 0.1
 EXACT_MATCH = 1
 PARTIAL_MATCH = 0
+FRAME_BUDGET = 0.016  # seconds of computation between two repaints in Run All
+EXPERIMENTS_GAMES = 200
+MIN_TARGET_LENGTH, MAX_TARGET_LENGTH = 1, 6
+MIN_POPULATION_SIZE, MAX_POPULATION_SIZE = 4, 11
 
 
 def generate_combination(length):
@@ -46,6 +54,36 @@ def mutate(combination, length):
     return combination
 
 
+def evolve(scored_population, population_size, length):
+    # Next population: the best half survives and is completed by crossovers
+    scored_population.sort(key=lambda x: x[1], reverse=True)
+    survivors = [combo for combo, _ in scored_population[: population_size // 2]]
+    if random.random() < MUTATION_RATE:
+        survivors[-1] = mutate(survivors[-1], length)
+
+    new_population = survivors[:]
+    while len(new_population) < population_size:
+        parents = random.sample(survivors, 2)
+        new_population.append(crossover(parents[0], parents[1], length))
+    return new_population
+
+
+def play_game(target_length, population_size):
+    # Plays a whole game without any window, returns the generations needed
+    target = generate_combination(target_length)
+    population = [generate_combination(target_length) for _ in range(population_size)]
+    generation = 0
+    while True:
+        scored_population = [
+            (combination, score_combination(combination, target))
+            for combination in population
+        ]
+        if any(score == target_length for _, score in scored_population):
+            return generation
+        population = evolve(scored_population, population_size, target_length)
+        generation += 1
+
+
 class StartScreen:
     def __init__(self, root, start_callback):
         self.root = root
@@ -85,7 +123,10 @@ class StartScreen:
         length = self.target_length.get()
         size = self.population_size.get()
 
-        if not (1 <= length <= 6 and 4 <= size <= 11):
+        if not (
+            MIN_TARGET_LENGTH <= length <= MAX_TARGET_LENGTH
+            and MIN_POPULATION_SIZE <= size <= MAX_POPULATION_SIZE
+        ):
             messagebox.showerror("Invalid Input", "Please enter valid values.")
             return
 
@@ -109,6 +150,7 @@ class MastermindGUI:
         self.generation = 0
         self.found = False
         self.scored_population = []
+        self.score_population()
 
         # Building panels
         frame = tk.Frame(root)
@@ -161,70 +203,135 @@ class MastermindGUI:
         )
         self.run_all_button.pack(pady=10)
 
+        self.run_many_button = tk.Button(
+            right_pane,
+            text=f"Run {EXPERIMENTS_GAMES} Games",
+            command=self.run_many_games,
+            font=("Times", 40),
+            bg="lightyellow",
+        )
+        self.run_many_button.pack(pady=10)
+
+        self.label_experiments = tk.Label(right_pane, text="", font=("Times", 30))
+        self.label_experiments.pack(pady=10)
+
+        # Canvas items are created once, then only their color and text change
+        self.create_canvas_items()
         self.draw_secret_code()
         self.draw_population()
 
+    def create_canvas_items(self):
+        self.secret_ovals = [
+            self.secret_code_canvas.create_oval(
+                30 + j * 50, 30, 70 + j * 50, 70, fill="white"
+            )
+            for j in range(self.target_length)
+        ]
+        self.population_ovals, self.score_texts = [], []
+        for i in range(self.population_size):
+            self.population_ovals.append(
+                [
+                    self.population_canvas.create_oval(
+                        50 + j * 100, 50 + i * 70, 90 + j * 100, 90 + i * 70
+                    )
+                    for j in range(self.target_length)
+                ]
+            )
+            self.score_texts.append(
+                self.population_canvas.create_text(
+                    800, 70 + i * 70, text="", font=("Times", 40)
+                )
+            )
+
     def draw_secret_code(self):
-        self.secret_code_canvas.delete("all")
-        for j, color in enumerate(self.target_combination):
-            x0, y0 = 30 + j * 50, 30
-            x1, y1 = x0 + 40, y0 + 40
-            self.secret_code_canvas.create_oval(x0, y0, x1, y1, fill=color.lower())
+        for oval, color in zip(self.secret_ovals, self.target_combination):
+            self.secret_code_canvas.itemconfig(oval, fill=color.lower())
 
     def draw_population(self):
-        self.population_canvas.delete("all")
-        self.scored_population.clear()
-        for i, combination in enumerate(self.population):
-            for j, color in enumerate(combination):
-                x0, y0 = 50 + j * 100, 50 + i * 70
-                x1, y1 = x0 + 40, y0 + 40
-                self.population_canvas.create_oval(x0, y0, x1, y1, fill=color.lower())
-            score = score_combination(combination, self.target_combination)
-            self.scored_population.append((combination, score))
-            self.population_canvas.create_text(
-                800, 70 + i * 70, text=f"Score: {score}", font=("Times", 40)
+        for i, (combination, score) in enumerate(self.scored_population):
+            for oval, color in zip(self.population_ovals[i], combination):
+                self.population_canvas.itemconfig(oval, fill=color.lower())
+            self.population_canvas.itemconfig(
+                self.score_texts[i], text=f"Score: {score}"
             )
 
         self.label_generation.config(text=f"Generation: {self.generation}")
 
+    def score_population(self):
+        self.scored_population = [
+            (combination, score_combination(combination, self.target_combination))
+            for combination in self.population
+        ]
+
+    def show_target_found(self):
+        self.draw_population()
+        self.label_generation.config(
+            text=f"Target found in generation {self.generation}"
+        )
+        self.next_button.config(state="disabled")
+        self.run_all_button.config(state="disabled")
+        # messagebox.showinfo(
+        #    "Winner",
+        #    f"WINNER \n The target was found in generation {self.generation}!",
+        # )
+
     def next_generation(self):
-        # Check if any combination matches the target
+        if self.step():
+            self.show_target_found()
+        else:
+            self.draw_population()
+
+    def step(self):
+        # Computes one generation, returns True if the target was already found
         for combination, score in self.scored_population:
             if score == self.target_length:
                 self.found = True
                 print(
                     f"Target combination found: {combination} in generation {self.generation}"
                 )
-                self.label_generation.config(
-                    text=f"Target found in generation {self.generation}"
-                )
-                self.next_button.config(state="disabled")
-                self.run_all_button.config(state="disabled")
-                # messagebox.showinfo(
-                #    "Winner",
-                #    f"WINNER \n The target was found in generation {self.generation}!",
-                # )
-                return
+                return True
 
-        self.scored_population.sort(key=lambda x: x[1], reverse=True)
-        survivors = [
-            combo for combo, _ in self.scored_population[: self.population_size // 2]
-        ]
-        if random.random() < MUTATION_RATE:
-            survivors[-1] = mutate(survivors[-1], self.target_length)
-
-        new_population = survivors[:]
-        while len(new_population) < self.population_size:
-            parents = random.sample(survivors, 2)
-            new_population.append(crossover(parents[0], parents[1], self.target_length))
-
-        self.population = new_population
+        self.population = evolve(
+            self.scored_population, self.population_size, self.target_length
+        )
         self.generation += 1
-        self.draw_population()
+        self.score_population()
+        return False
+
+    def run_many_games(self):
+        # The games are played by the warm workers of mastermind_pool.py when it
+        # is running, here otherwise
+        settings = {"length": self.target_length, "population": self.population_size}
+        try:
+            response = pooled_experiments("v0", settings, EXPERIMENTS_GAMES)
+            generations = response["generations"]
+            origin = f"pool, started in {1000 * response['dispatch']:.1f} ms"
+        except OSError:
+            generations = [
+                play_game(self.target_length, self.population_size)
+                for _ in range(EXPERIMENTS_GAMES)
+            ]
+            origin = "played here"
+        self.label_experiments.config(
+            text=f"{len(generations)} games ({origin})\n"
+            f"Mean: {statistics.mean(generations):.1f} generations\n"
+            f"Min: {min(generations)}, Max: {max(generations)}"
+        )
 
     def run_all_generations(self):
-        while not self.found:
-            self.next_generation()
+        self.next_button.config(state="disabled")
+        self.run_all_button.config(state="disabled")
+        self.root.after(0, self.run_generations_batch)
+
+    def run_generations_batch(self):
+        # Computes generations during FRAME_BUDGET, then lets Tk repaint the window
+        deadline = time.perf_counter() + FRAME_BUDGET
+        while time.perf_counter() < deadline:
+            if self.step():
+                self.show_target_found()
+                return
+        self.draw_population()
+        self.root.after(1, self.run_generations_batch)
 
 
 if __name__ == "__main__":
@@ -19,9 +19,25 @@ through an interactive Mastermind game.
 ##-------------##
 import pygame
 import random
+import math
 from collections import Counter
 import heapq
 import statistics
+import time
+from functools import lru_cache
+from itertools import chain
+import argparse
+import os
+import pickle
+import struct
+import mmap
+import bisect
+import multiprocessing
+import json
+import operator
+
+from mastermind_metrics import METRICS_INTERVAL, MetricsExporter
+from mastermind_pool import pooled_experiments
 
 ##---CONSTANTS VARIABLES AND INIT---##
 ##----------------------------------##
@@ -34,27 +50,107 @@ MIN_POPULATION_SIZE = 4
 MAX_POPULATION_SIZE = 10
 MIN_MUTATION_RATE = 0
 MAX_MUTATION_RATE = 100  # percentage
+MUTATION_MODES = {  # mode: label, see adapt_mutation_rate
+    "fixed": "Fixe",
+    "one_fifth": "Règle 1/5",
+    "diversity": "Diversité",
+    "self_adaptive": "Auto-adaptative",
+}
+ADAPTATION_WINDOW = 10  # generations between two updates of the 1/5 rule
+ADAPTATION_FACTOR = 0.85  # adaptive rates are multiplied or divided by it
+DIVERSITY_TARGET = 0.6  # share of distinct genomes kept by the diversity mode
+MIN_ADAPTIVE_RATE = 5  # percentage, an adaptive rate never falls to zero
+SELF_ADAPTATION_TAU = 0.3  # step of the log-normal perturbation of the rates
+CONSISTENCY_MAX_GENERATIONS = 200  # GA generations allowed per guess
+MAX_DEDUP_RETRIES = 10  # attempts to replace a duplicated individual
+EXPERIMENTS_PRECISION = 1  # target half-width of the mean generations interval
+EXPERIMENTS_CONFIDENCE = 0.95
+EXPERIMENTS_BATCH_SIZE = 30  # games played between two interval updates
+MAX_EXPERIMENTS = 10000
+MAX_WINDOW_EXPERIMENTS = 2000  # games of the precision button of the game screen
+CHECKPOINT_INTERVAL = 5  # seconds between two experiment checkpoints
+CHECKPOINT_ATTRIBUTES = (  # MastermindGame state saved by the checkpoints
+    "target_combination",
+    "population",
+    "scores",
+    "survivors",
+    "generation",
+    "found",
+    "history",
+    "duplicate_rate",
+    "evaluations",
+    "checked_genomes",
+    "duplicates",
+    "duplicates_replaced",
+    "evaluations_avoided",
+    "genome_scores",
+    "current_mutation_rate",
+    "mutation_rates",
+    "successes",
+    "best_score",
+    "inner_generation",
+    "all_secrets_found",
+    "all_cpu_times",
+)
+# Settings found by mastermind_tuner.py, default settings of the start screen
+TUNED_PARAMETERS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "mastermind_tuned.json"
+)
 SCREEN_WIDTH = 1500
 SCREEN_HEIGHT = 800
+START_SCREEN_COLOR = (240, 248, 255)  # AliceBlue background
+MAX_FPS = 60
+STATS_PANEL_LINES = 7  # stats of the game screen drawn at the usual size
+DASHBOARD_GAMES = 16  # games shown by the start screen dashboard
+MAX_DASHBOARD_GAMES = 100
+DASHBOARD_WIDTH = 1100  # width of the boards, the stats are on the right
+DASHBOARD_FRAME_SHARE = 0.8  # share of each frame spent on the games and drawing
+DASHBOARD_MIN_SIMULATION_SHARE = 0.2  # share of each frame always left to the games
+DASHBOARD_HIGHLIGHT = 0.2  # seconds a board stays highlighted after a solve
 
-# Initialization of Pygame
-pygame.init()
+# Screen and fonts are created by init_display, so that the engine and the
+# experiments can run without opening a window
+screen = None
+font_large = font_medium = font_small = font_super_small = font_tiny = None
 
-# Set up screen
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Bienvenue dans le jeu Mastermind !")
 
-# Fonts
-font_large = pygame.font.Font(None, 70)
-font_medium = pygame.font.Font(None, 50)
-font_small = pygame.font.Font(None, 40)
-font_super_small = pygame.font.Font(None, 30)
+def init_display(headless=False):
+    global screen, font_large, font_medium, font_small, font_super_small, font_tiny
+
+    # SDL's dummy driver renders into memory, without any window
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+    # Initialization of Pygame
+    pygame.init()
+
+    # Set up screen
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Bienvenue dans le jeu Mastermind !")
+
+    # Fonts
+    font_large = pygame.font.Font(None, 70)
+    font_medium = pygame.font.Font(None, 50)
+    font_small = pygame.font.Font(None, 40)
+    font_super_small = pygame.font.Font(None, 30)
+    font_tiny = pygame.font.Font(None, 24)
 
 
 ##---GENERIC FUNCTIONS---##
 ##-----------------------##
-def generate_combination(length):
-    return [random.choice(COLORS) for _ in range(length)]
+COLOR_INDEX = {color: i for i, color in enumerate(COLORS)}
+
+
+def generate_combination(length, rng=random):
+    return [rng.choice(COLORS) for _ in range(length)]
+
+
+def pack_combination(combination):
+    # Combination as a single integer in base len(COLORS)
+    packed = 0
+    for color in combination:
+        packed = packed * len(COLORS) + COLOR_INDEX[color]
+    return packed
 
 
 def score_combination(combination, target, exact_only=True):
@@ -87,6 +183,31 @@ def score_population(population, target, scoring_function=score_combination):
     }
 
 
+def match_counts(combination, target):
+    # (exact matches, partial matches), unlike the score two different
+    # feedbacks never give the same value: (2, 0), (1, 2) and (0, 4) all score 2
+    exact_match = sum(map(operator.eq, combination, target))
+    common = sum(min(combination.count(color), target.count(color)) for color in COLORS)
+    return exact_match, common - exact_match
+
+
+@lru_cache(maxsize=2**16)
+def cached_feedback(guess, candidate):
+    # Feedback the guess would receive if the candidate was the secret code
+    return match_counts(guess, candidate)
+
+
+def consistency_score(combination, history):
+    # 0 if the combination agrees with every past (guess, feedback), negative otherwise
+    candidate = tuple(combination)
+    distance = 0
+    for guess, (exact_match, partial_match) in history:
+        candidate_exact, candidate_partial = cached_feedback(guess, candidate)
+        distance += abs(candidate_exact - exact_match)
+        distance += abs(candidate_partial - partial_match)
+    return -distance
+
+
 def get_top_combinations(population, scores, n):
     top_scores = heapq.nlargest(
         n, scores.items(), key=lambda x: x[1]
@@ -95,24 +216,286 @@ def get_top_combinations(population, scores, n):
     return survivors  # dict {index: combination}
 
 
-def crossover(parent1, parent2):
-    return [random.choice([parent1[i], parent2[i]]) for i in range(len(parent1))]
+def crossover(parent1, parent2, rng=random):
+    return [rng.choice([parent1[i], parent2[i]]) for i in range(len(parent1))]
 
 
-def mutate(individual, mutation_rate):
+def mutate(individual, mutation_rate, rng=random):
     mutation_rate = float(mutation_rate) / 100.0  # From percentage to float
     for i in range(len(individual)):
-        if random.random() < mutation_rate:
-            individual[i] = random.choice(
+        if rng.random() < mutation_rate:
+            individual[i] = rng.choice(
                 [color for color in COLORS if color != individual[i]]
             )
     return individual
 
 
+def mutate_one_gene(individual, rng=random):
+    index = rng.randrange(len(individual))
+    individual[index] = rng.choice(
+        [color for color in COLORS if color != individual[index]]
+    )
+    return individual
+
+
+class RunningStats:
+    # Streaming mean and variance (Welford's algorithm)
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def push(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def stdev(self):
+        if self.count < 2:
+            return 0.0
+        return (self.m2 / (self.count - 1)) ** 0.5
+
+    def half_width(self, confidence):
+        # Normal approximation of the confidence interval of the mean
+        if self.count < 2:
+            return float("inf")
+        z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+        return z * self.stdev() / self.count**0.5
+
+
+class GameBatch:
+    # Many games advanced together, one generation each per step. The callers
+    # read the generations of the solved games themselves: found is set without
+    # check_solution, whose lists would grow without limit in a long-running
+    # batch (server)
+    def __init__(self, games=()):
+        self.games = []
+        for game in games:
+            self.add(game)
+
+    def add(self, game):
+        game.found = game.is_solved()  # If the initial population has the solution
+        self.games.append(game)
+
+    def __len__(self):
+        return len(self.games)
+
+    def step(self):
+        # Returns the games solved by this step, they leave the batch
+        for game in self.games:
+            game.next_generation()
+            game.found = game.is_solved()
+        solved = [game for game in self.games if game.found]
+        if solved:
+            self.games = [game for game in self.games if not game.found]
+        return solved
+
+    def remove(self, game):
+        self.games.remove(game)
+
+
+##---RECORDING AND REPLAY---##
+##--------------------------##
+# Log layout (little endian):
+#   header: magic, version, target length, population size, number of colors
+#   record: flags, generation, genomes of every slot in slot order (one color
+#           index per byte), their scores (float32), survivors bitmask
+#           [target, one color index per byte, if the record starts a game]
+# Every record holds the whole population, so any generation is read on its own.
+# The records have a fixed width and are built by C loops (map, bytes and a
+# single struct call): it costs much less than finding the slots that changed
+# since the previous generation, or packing each genome into an integer.
+LOG_MAGIC = b"MMGL"
+LOG_VERSION = 2
+LOG_HEADER = struct.Struct("<4sBBHB")
+FLAG_GAME_START = 1
+
+
+def record_struct(target_length, population_size):
+    # flags, generation, genomes, scores, survivors bitmask
+    mask_size = (population_size + 7) // 8
+    return struct.Struct(
+        f"<BI{target_length * population_size}s{population_size}f{mask_size}s"
+    )
+
+
+def color_indexes(combinations):
+    # One byte per color of the combinations, in order
+    return bytes(map(COLOR_INDEX.__getitem__, chain.from_iterable(combinations)))
+
+
+class GenerationRecorder:
+    # Appends the generations of one or many games to a binary log
+    def __init__(self, path, target_length, population_size):
+        self.file = open(path, "wb")
+        self.record_struct = record_struct(target_length, population_size)
+        self.mask_size = (population_size + 7) // 8
+        self.slots = range(1, population_size + 1)
+        self.slot_bits = {slot: 1 << (slot - 1) for slot in self.slots}
+        self.file.write(
+            LOG_HEADER.pack(
+                LOG_MAGIC, LOG_VERSION, target_length, population_size, len(COLORS)
+            )
+        )
+
+    def record(self, generation, population, scores, survivors, target=None):
+        mask = sum(map(self.slot_bits.__getitem__, survivors))
+        record = self.record_struct.pack(
+            FLAG_GAME_START if target is not None else 0,
+            generation,
+            color_indexes(map(population.__getitem__, self.slots)),
+            *map(scores.__getitem__, self.slots),
+            mask.to_bytes(self.mask_size, "little"),
+        )
+        if target is not None:
+            record += color_indexes([target])
+        self.file.write(record)
+
+    def close(self):
+        self.file.close()
+
+
+class GenerationLog:
+    # Memory-mapped reader of a GenerationRecorder log
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.target_length, self.population_size, n_colors = (
+            LOG_HEADER.unpack_from(self.data, 0)
+        )
+        if magic != LOG_MAGIC or version != LOG_VERSION or n_colors != len(COLORS):
+            raise ValueError(f"{path} is not a generation log")
+        self.record_struct = record_struct(self.target_length, self.population_size)
+
+        # Only the flags are read to index the log
+        self.offsets, self.game_starts = [], []
+        offset = LOG_HEADER.size
+        while offset + self.record_struct.size <= len(self.data):
+            game_start = self.data[offset] & FLAG_GAME_START
+            size = self.record_struct.size + (self.target_length if game_start else 0)
+            if offset + size > len(self.data):
+                break  # Last record of an interrupted recording
+            if game_start:
+                self.game_starts.append(len(self.offsets))
+            self.offsets.append(offset)
+            offset += size
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def game_range(self, game):
+        # Indexes [first, last) of the records of a game
+        first = self.game_starts[game]
+        if game + 1 < len(self.game_starts):
+            return first, self.game_starts[game + 1]
+        return first, len(self.offsets)
+
+    def game_of(self, index):
+        return bisect.bisect_right(self.game_starts, index) - 1
+
+    def combination(self, indexes):
+        return [COLORS[color_index] for color_index in indexes]
+
+    def read_record(self, index):
+        offset = self.offsets[index]
+        flags, generation, genomes, *scores, mask = self.record_struct.unpack_from(
+            self.data, offset
+        )
+        target = None
+        if flags & FLAG_GAME_START:
+            offset += self.record_struct.size
+            target = self.combination(self.data[offset : offset + self.target_length])
+        population = {
+            slot: self.combination(genomes[i : i + self.target_length])
+            for slot, i in enumerate(range(0, len(genomes), self.target_length), 1)
+        }
+        # Scores are multiples of 0.5, exact in float32
+        scores = {
+            slot: int(score) if score.is_integer() else score
+            for slot, score in enumerate(scores, 1)
+        }
+        return generation, target, population, scores, int.from_bytes(mask, "little")
+
+    def frame(self, index):
+        generation, _, population, scores, mask = self.read_record(index)
+        survivors = {
+            slot: population[slot] for slot in population if mask & (1 << (slot - 1))
+        }
+        target = self.read_record(self.game_starts[self.game_of(index)])[1]
+        return generation, target, population, scores, survivors
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+##---RENDERING---##
+##---------------##
+class RenderScheduler:
+    # Redraws only when something changed and sleeps on the event queue otherwise.
+    # Small changes (hovered buttons) are pushed to the window as dirty rectangles.
+    def __init__(self, max_fps=MAX_FPS):
+        self.clock = pygame.time.Clock()
+        self.max_fps = max_fps
+        self.full_redraw = True
+        self.dirty_rects = []
+        self.hovered = None
+        self.animating = False
+
+    def invalidate(self, rect=None):
+        if rect is None:
+            self.full_redraw = True
+        else:
+            self.dirty_rects.append(rect)
+
+    def present(self):
+        if not self.full_redraw and not self.dirty_rects:
+            return
+        if self.full_redraw:
+            pygame.display.update()
+        else:
+            pygame.display.update(self.dirty_rects)
+        self.full_redraw = False
+        self.dirty_rects = []
+
+        # Caps the frame rate while the screen keeps changing
+        self.clock.tick(self.max_fps)
+
+    def events(self):
+        # Blocks until the next event, unless an animation is running
+        if self.animating:
+            events = pygame.event.get()
+        else:
+            events = [pygame.event.wait()] + pygame.event.get()
+        for event in events:
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.invalidate()
+        return events
+
+    def update_hover(self, button_rects, mouse_pos, redraw_button):
+        # Redraws the buttons whose hover state changed, redraw_button(name, hover)
+        # must return the rect of the redrawn button
+        hovered = None
+        for name, rect in button_rects.items():
+            if rect.collidepoint(mouse_pos):
+                hovered = name
+        if hovered != self.hovered:
+            for name in (self.hovered, hovered):
+                if name is not None:
+                    self.invalidate(redraw_button(name, name == hovered))
+            self.hovered = hovered
+
+
 ##---START SCREEN---##
 ##------------------##
 class StartScreen:
-    def __init__(self):
+    def __init__(self, record_path=None):
+        self.record_path = record_path
         # Settings for the start screen inputs
         self.settings = {
             "target_length": {"value": 4, "active": False, "input": "4"},
@@ -121,6 +504,33 @@ class StartScreen:
         }
         self.show_secret_code = True
         self.show_best = True
+        self.consistency_mode = False
+        self.deduplicate = False
+        self.mutation_mode = "fixed"
+        self.load_tuned_parameters(TUNED_PARAMETERS_PATH)
+
+    def load_tuned_parameters(self, path):
+        # The settings found by the tuner replace the defaults, if there are any
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path) as file:
+                parameters = json.load(file)
+            settings = {
+                key: self.validate_value(key, int(parameters[key]))
+                for key in ["target_length", "population_size", "mutation_rate"]
+                if key in parameters
+            }
+            mutation_mode = parameters.get("mutation_mode", self.mutation_mode)
+        except (OSError, ValueError, TypeError, AttributeError):
+            return  # An unreadable file is ignored
+        for key, value in settings.items():
+            self.settings[key]["value"] = value
+            self.settings[key]["input"] = str(value)
+        if mutation_mode in MUTATION_MODES:
+            self.mutation_mode = mutation_mode
+        self.consistency_mode = bool(parameters.get("consistency_mode", False))
+        self.deduplicate = bool(parameters.get("deduplicate", False))
 
     def draw_input_field(self, x, y, width, key):
         # Draw an input field for numeric settings
@@ -197,8 +607,19 @@ class StartScreen:
                 self.show_secret_code = not self.show_secret_code
             if self.checkbox_best_rect.collidepoint(mouse_pos):
                 self.show_best = not self.show_best
+            if self.checkbox_consistency_rect.collidepoint(mouse_pos):
+                self.consistency_mode = not self.consistency_mode
+            if self.checkbox_dedup_rect.collidepoint(mouse_pos):
+                self.deduplicate = not self.deduplicate
+            if self.mutation_mode_rect.collidepoint(mouse_pos):
+                # Cycle through the mutation modes
+                modes = list(MUTATION_MODES)
+                next_index = (modes.index(self.mutation_mode) + 1) % len(modes)
+                self.mutation_mode = modes[next_index]
             if self.start_button_rect.collidepoint(mouse_pos):
                 self.start_game()
+            if self.dashboard_button_rect.collidepoint(mouse_pos):
+                self.start_dashboard()
         elif event.type == pygame.KEYDOWN:
             for key, field in self.settings.items():
                 if field["active"]:
@@ -233,8 +654,8 @@ class StartScreen:
             return max(MIN_MUTATION_RATE, min(MAX_MUTATION_RATE, value))
         return value
 
-    def start_game(self):
-        # Start the game with validated input settings
+    def game_settings(self):
+        # Validated input settings
         try:
             target_length = self.validate_value(
                 "target_length", int(self.settings["target_length"]["input"])
@@ -250,75 +671,140 @@ class StartScreen:
             target_length = self.settings["target_length"]["value"]
             population_size = self.settings["population_size"]["value"]
             mutation_rate = self.settings["mutation_rate"]["value"]
+        return {
+            "target_length": target_length,
+            "population_size": population_size,
+            "mutation_rate": mutation_rate,
+            "show_secret_code": self.show_secret_code,
+            "show_best": self.show_best,
+            "consistency_mode": self.consistency_mode,
+            "deduplicate": self.deduplicate,
+            "mutation_mode": self.mutation_mode,
+        }
 
+    def start_game(self):
         # Launch the game
-        game = MastermindGame(
-            target_length=target_length,
-            population_size=population_size,
-            mutation_rate=mutation_rate,
-            show_secret_code=self.show_secret_code,
-            show_best=self.show_best,
-        )
+        game = MastermindGame(**self.game_settings())
+        if self.record_path is not None:
+            game.start_recording(self.record_path)
         game.run_game()
+        if game.recorder is not None:
+            game.recorder.close()
+
+    def start_dashboard(self):
+        settings = self.game_settings()
+        Dashboard([MastermindGame(**settings) for _ in range(DASHBOARD_GAMES)]).run()
+
+    def draw_start_button(self, hover=False):
+        return self.draw_button(
+            SCREEN_WIDTH // 2 - 100,
+            700,
+            "Jouer",
+            font_medium,
+            (0, 158, 115),
+            (0, 0, 0),
+            (0, 0, 0),
+            hover=hover,
+        )
+
+    def draw_dashboard_button(self, hover=False):
+        return self.draw_button(
+            SCREEN_WIDTH // 2 + 100,
+            705,
+            f"Tableau de bord ({DASHBOARD_GAMES} parties)",
+            font_super_small,
+            (86, 180, 233),
+            (0, 0, 0),
+            (0, 0, 0),
+            hover=hover,
+        )
+
+    def redraw_start_button(self, name, hover):
+        if name == "dashboard":
+            screen.fill(START_SCREEN_COLOR, self.dashboard_button_rect)
+            return self.draw_dashboard_button(hover=hover)
+        screen.fill(START_SCREEN_COLOR, self.start_button_rect)
+        return self.draw_start_button(hover=hover)
+
+    def draw_start_screen(self, hovered=None):
+        screen.fill(START_SCREEN_COLOR)
+        title_text = font_large.render(
+            "Bienvenue dans le jeu Mastermind !", True, (86, 180, 233)
+        )
+        screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 50))
+
+        y_offset = 180
+        for key, label, label_x in [
+            ("target_length", "Longueur Code Secret", 390),
+            ("population_size", "Taille Population", 295),
+            ("mutation_rate", "Mutation (%)", 220),
+        ]:
+            label_surface = font_medium.render(label, True, (0, 0, 0))
+            label_x = SCREEN_WIDTH // 2 - label_x
+            input_x = SCREEN_WIDTH // 2
+            screen.blit(label_surface, (label_x, y_offset))
+            self.settings[key]["rect"] = pygame.Rect(input_x, y_offset, 150, 40)
+            self.draw_input_field(input_x, y_offset, 150, key)
+            y_offset += 80
+
+        # Mutation mode, next to the mutation rate
+        self.mutation_mode_rect = self.draw_button(
+            SCREEN_WIDTH // 2 + 170,
+            340,
+            f"Mode : {MUTATION_MODES[self.mutation_mode]}",
+            font_super_small,
+            (255, 255, 255),
+            (0, 0, 0),
+            (0, 0, 0),
+        )
+
+        # Checkboxes
+        self.checkbox_secret_rect = self.draw_checkbox(
+            SCREEN_WIDTH // 2 - 295,
+            405,
+            "Afficher Code Secret",
+            self.show_secret_code,
+        )
+        self.checkbox_best_rect = self.draw_checkbox(
+            SCREEN_WIDTH // 2 - 280, 480, "Afficher Survivants", self.show_best
+        )
+        self.checkbox_consistency_rect = self.draw_checkbox(
+            SCREEN_WIDTH // 2 - 255, 555, "Mode Cohérence", self.consistency_mode
+        )
+        self.checkbox_dedup_rect = self.draw_checkbox(
+            SCREEN_WIDTH // 2 - 235, 630, "Sans Doublons", self.deduplicate
+        )
+
+        # Start Buttons
+        self.start_button_rect = self.draw_start_button(hover=hovered == "start")
+        self.dashboard_button_rect = self.draw_dashboard_button(
+            hover=hovered == "dashboard"
+        )
 
     def show(self):
-        # Main loop for the start screen
+        # Main loop for the start screen, redrawn only after an input
+        scheduler = RenderScheduler()
         running = True
         while running:
-            screen.fill((240, 248, 255))  # AliceBlue background
-            title_text = font_large.render(
-                "Bienvenue dans le jeu Mastermind !", True, (86, 180, 233)
-            )
-            screen.blit(
-                title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 50)
-            )
+            if scheduler.full_redraw:
+                self.draw_start_screen(hovered=scheduler.hovered)
+            scheduler.present()
 
-            y_offset = 180
-            for key, label, label_x in [
-                ("target_length", "Longueur Code Secret", 390),
-                ("population_size", "Taille Population", 295),
-                ("mutation_rate", "Mutation (%)", 220),
-            ]:
-                label_surface = font_medium.render(label, True, (0, 0, 0))
-                label_x = SCREEN_WIDTH // 2 - label_x
-                input_x = SCREEN_WIDTH // 2
-                screen.blit(label_surface, (label_x, y_offset))
-                self.settings[key]["rect"] = pygame.Rect(input_x, y_offset, 150, 40)
-                self.draw_input_field(input_x, y_offset, 150, key)
-                y_offset += 80
-
-            # Checkboxes
-            self.checkbox_secret_rect = self.draw_checkbox(
-                SCREEN_WIDTH // 2 - 295,
-                405,
-                "Afficher Code Secret",
-                self.show_secret_code,
-            )
-            self.checkbox_best_rect = self.draw_checkbox(
-                SCREEN_WIDTH // 2 - 280, 480, "Afficher Survivants", self.show_best
-            )
-
-            # Start Button
-            mouse_pos = pygame.mouse.get_pos()
-            start_hover = pygame.Rect(
-                SCREEN_WIDTH // 2 - 100, 700, 140, 60
-            ).collidepoint(mouse_pos)
-            self.start_button_rect = self.draw_button(
-                SCREEN_WIDTH // 2 - 100,
-                700,
-                "Jouer",
-                font_medium,
-                (0, 158, 115),
-                (0, 0, 0),
-                (0, 0, 0),
-                hover=start_hover,
-            )
-
-            pygame.display.update()
-            for event in pygame.event.get():
+            for event in scheduler.events():
                 if event.type == pygame.QUIT:
                     running = False
-                self.handle_events(event)
+                elif event.type == pygame.MOUSEMOTION:
+                    scheduler.update_hover(
+                        {
+                            "start": self.start_button_rect,
+                            "dashboard": self.dashboard_button_rect,
+                        },
+                        event.pos,
+                        self.redraw_start_button,
+                    )
+                elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN):
+                    self.handle_events(event)
+                    scheduler.invalidate()
 
 
 ##---MAIN GAME CLASS---##
@@ -331,26 +817,74 @@ class MastermindGame:
         mutation_rate,
         show_secret_code,
         show_best,
+        consistency_mode=False,
+        deduplicate=False,
+        seed=None,
+        secret=None,
+        mutation_mode="fixed",
     ):
+        # Random generator of the game, its state is saved by the checkpoints
+        self.rng = random.Random(seed)
         self.target_length = target_length
         self.population_size = population_size
         self.show_secret_code = show_secret_code
         self.show_best = show_best
         self.mutation_rate = mutation_rate
-        self.stats_exp = {"Min": 0, "Max": 0, "Moyenne": 0, "Ecart-type": 0}
-        self.target_combination = generate_combination(target_length)
+        # In consistency mode, only one guess per generation is compared to the
+        # secret code and the fitness is the agreement with the past feedbacks
+        self.consistency_mode = consistency_mode
+        # Keeps every genome of a generation unique (see evolve_population)
+        self.deduplicate = deduplicate
+        # The mutation rate can adapt during a game (see adapt_mutation_rate)
+        self.mutation_mode = mutation_mode
+        self.reset_mutation_control()
+        self.stats_exp = {
+            "Min": 0,
+            "Max": 0,
+            "Moyenne": 0,
+            "Ecart-type": 0,
+            "Temps CPU (ms)": 0,
+        }
+        # The secret code is drawn at random unless it is given
+        if secret is None:
+            self.target_combination = generate_combination(target_length, self.rng)
+        else:
+            self.target_combination = list(secret)
         self.generation = 0
         self.found = False
         self.secrets_found, self.all_secrets_found = [], []
+        self.all_cpu_times = []
+
+        # Scoring calls and duplicated genomes counters
+        self.evaluations = 0
+        self.checked_genomes, self.duplicates, self.duplicates_replaced = 0, 0, 0
+        self.evaluations_avoided = 0
+        self.duplicate_rate = 0
+
+        # dict {genome: score} of the current generation, reused by the next
+        # one in the deduplicated mode, see score_new_genomes
+        self.genome_scores = {}
+
+        # list [(guess, (exact, partial)), ...] of the guesses played in
+        # consistency mode
+        self.history = []
+        # GA generations spent searching the next guess in consistency mode
+        self.inner_generation = 0
+
+        # GenerationRecorder logging every generation, see start_recording
+        self.recorder = None
+
+        # Gradient background surface, see draw_gradient_background
+        self.background, self.background_colors = None, None
 
         # dict {index: combination}
         self.population = {
-            i: generate_combination(target_length)
+            i: generate_combination(target_length, self.rng)
             for i in range(1, population_size + 1)
         }
 
         # dict {index: score}
-        self.scores = score_population(self.population, self.target_combination)
+        self.scores = self.evaluate_population()
 
         # dict {index: combination}
         self.survivors = get_top_combinations(
@@ -420,13 +954,20 @@ class MastermindGame:
             )
 
     def draw_gradient_background(self, screen, color1, color2):
-        for y in range(SCREEN_HEIGHT):
-            blend_ratio = y / SCREEN_HEIGHT
-            blended_color = tuple(
-                int(color1[i] * (1 - blend_ratio) + color2[i] * blend_ratio)
-                for i in range(3)
-            )
-            pygame.draw.line(screen, blended_color, (0, y), (SCREEN_WIDTH, y))
+        # The gradient is drawn once on its own surface, then copied
+        if self.background_colors != (color1, color2):
+            self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            for y in range(SCREEN_HEIGHT):
+                blend_ratio = y / SCREEN_HEIGHT
+                blended_color = tuple(
+                    int(color1[i] * (1 - blend_ratio) + color2[i] * blend_ratio)
+                    for i in range(3)
+                )
+                pygame.draw.line(
+                    self.background, blended_color, (0, y), (SCREEN_WIDTH, y)
+                )
+            self.background_colors = (color1, color2)
+        screen.blit(self.background, (0, 0))
 
     def display_variables(
         self,
@@ -440,6 +981,7 @@ class MastermindGame:
         padding=10,
         border_color=(0, 0, 0),
         border_width=2,
+        line_spacing=10,
     ):
         lines = [f"{name} : {value}" for name, value in dict_var.items()]
         text_surfaces = [font.render(line, True, color) for line in lines]
@@ -447,7 +989,7 @@ class MastermindGame:
         max_text_width = max(text.get_width() for text in text_surfaces)
         total_height = (
             sum(text.get_height() for text in text_surfaces)
-            + (len(text_surfaces) - 1) * 10
+            + (len(text_surfaces) - 1) * line_spacing
         )
 
         frame_width = max_text_width + 2 * padding
@@ -471,7 +1013,7 @@ class MastermindGame:
         for text in text_surfaces:
             text_x = x - text.get_width() // 2
             screen.blit(text, (text_x, current_y))
-            current_y += text.get_height() + 10
+            current_y += text.get_height() + line_spacing
 
     def draw_button(
         self,
@@ -525,7 +1067,7 @@ class MastermindGame:
 
         # Histogram dimensions and position
         histogram_width = 500
-        histogram_height = 200
+        histogram_height = 150
         histogram_x = 900
         histogram_y = SCREEN_HEIGHT - histogram_height - 130
 
@@ -535,7 +1077,9 @@ class MastermindGame:
         else:
             max_iterations = 1
         bar_width = histogram_width / 10
-        scale = histogram_height / max_iterations
+        # The labels of the highest bar stay inside the histogram, under the stats
+        label_height = font_small.get_height() + 2
+        scale = (histogram_height - label_height) / max_iterations
 
         # Draw the histogram background
         pygame.draw.rect(
@@ -593,227 +1137,1278 @@ class MastermindGame:
         pygame.draw.rect(screen, (0, 0, 0), title_bg_rect, 2)  # Black border
         screen.blit(title_text, (title_x, title_y))
 
+    def evaluate_population(self):
+        self.evaluations += len(self.population)
+        # The whole population is rescored, so the former scores may be stale
+        self.genome_scores = {}
+        if self.consistency_mode:
+            return score_population(
+                self.population, self.history, scoring_function=consistency_score
+            )
+        return score_population(self.population, self.target_combination)
+
+    def is_solved(self):
+        if self.consistency_mode:
+            return bool(self.history) and self.history[-1][1][0] == self.target_length
+        return self.target_length in self.scores.values()
+
     def check_solution(self, run_many_exp=False):
-        if self.target_length in self.scores.values() and not self.found:
+        if self.is_solved() and not self.found:
             self.found = True
             if run_many_exp:
                 self.all_secrets_found.append(self.generation)
             else:
                 self.secrets_found.append(self.generation)
 
-    def reset_game(self):
+    def reset_game(self, secret=None):
         # Reset variables
         self.generation = 0
         self.found = False
+        self.duplicate_rate = 0
+        self.reset_mutation_control()
 
         del self.target_combination
-        self.target_combination = generate_combination(self.target_length)
+        if secret is None:
+            self.target_combination = generate_combination(self.target_length, self.rng)
+        else:
+            self.target_combination = list(secret)
+
+        del self.history
+        self.history = []
+        self.inner_generation = 0
 
         del self.population
         self.population = {
-            i: generate_combination(self.target_length)
+            i: generate_combination(self.target_length, self.rng)
             for i in range(1, self.population_size + 1)
         }
 
         del self.scores
-        self.scores = score_population(self.population, self.target_combination)
+        self.scores = self.evaluate_population()
 
         del self.survivors
         self.survivors = get_top_combinations(
             self.population, self.scores, self.population_size // 2
         )
+        self.record_generation(new_game=True)
 
-    def next_generation(self):
+    def next_generation(self, deadline=None):
+        # The deadline (time.perf_counter) only matters in consistency mode: a
+        # guess whose search reaches it is left unfinished, the search goes on
+        # at the next call
         if self.found:
             return
+        if self.consistency_mode and not self.search_consistent_guess(deadline):
+            return
 
         self.generation += 1
 
+        if self.consistency_mode:
+            self.play_consistent_guess()
+        else:
+            self.evolve_population()
+        self.record_generation()
+
+    def start_recording(self, path, record_current_game=True):
+        self.recorder = GenerationRecorder(
+            path, self.target_length, self.population_size
+        )
+        if record_current_game:
+            self.record_generation(new_game=True)
+
+    def record_generation(self, new_game=False):
+        if self.recorder is not None:
+            self.recorder.record(
+                self.generation,
+                self.population,
+                self.scores,
+                self.survivors,
+                target=self.target_combination if new_game else None,
+            )
+
+    def evolve_population(self):
         del self.population
         self.population = self.survivors
 
         # Mutation step
         for key in self.population.keys():
-            self.population[key] = mutate(self.population[key], self.mutation_rate)
+            self.population[key] = mutate(
+                self.population[key],
+                self.mutation_rates.get(key, self.current_mutation_rate),
+                self.rng,
+            )
 
         # Fill up the population
         survivors = list(self.population.values())
+        survivor_keys = list(self.population.keys())
         missing_idx = list(
             set(range(1, self.population_size + 1)) - set(self.population.keys())
         )
         idx_count = 0
         while idx_count < self.population_size - self.population_size // 2:
-            parents = random.sample(survivors, 2)
-            self.population[missing_idx[idx_count]] = crossover(parents[0], parents[1])
+            parent_keys = self.rng.sample(survivor_keys, 2)
+            self.population[missing_idx[idx_count]] = crossover(
+                self.population[parent_keys[0]],
+                self.population[parent_keys[1]],
+                self.rng,
+            )
+            if self.mutation_mode == "self_adaptive":
+                self.mutation_rates[missing_idx[idx_count]] = self.inherited_rate(
+                    parent_keys
+                )
             idx_count += 1
 
         # Calculate new scores
         del self.scores
-        self.scores = score_population(self.population, self.target_combination)
+        if self.deduplicate:
+            self.scores = self.score_new_genomes(self.remove_duplicates(survivors))
+        else:
+            self.scores = self.evaluate_population()
 
         # Determine new survivors
         del self.survivors
         self.survivors = get_top_combinations(
             self.population, self.scores, self.population_size // 2
         )
+        self.adapt_mutation_rate()
+
+    def reset_mutation_control(self):
+        # Rate applied to the whole population, it only moves in the adaptive modes
+        self.current_mutation_rate = self.mutation_rate
+        # dict {index: rate}, each individual carries its own rate in the
+        # self-adaptive mode
+        if self.mutation_mode == "self_adaptive":
+            self.mutation_rates = {
+                i: self.mutation_rate for i in range(1, self.population_size + 1)
+            }
+        else:
+            self.mutation_rates = {}
+        # Improvements of the best score since the last update of the 1/5 rule
+        self.successes = []
+        self.best_score = None
+
+    def inherited_rate(self, parent_keys):
+        # Mean rate of the parents with a log-normal perturbation, so that the
+        # rates of the individuals which survive are selected with them
+        rate = sum(self.mutation_rates[key] for key in parent_keys) / 2
+        rate *= math.exp(SELF_ADAPTATION_TAU * self.rng.gauss(0, 1))
+        return max(MIN_ADAPTIVE_RATE, min(MAX_MUTATION_RATE, rate))
+
+    def adapt_mutation_rate(self):
+        rate = self.current_mutation_rate
+        if self.mutation_mode == "one_fifth":
+            # 1/5 success rule: the rate grows when more than one generation out
+            # of five improves the best score of the game, and shrinks when fewer do
+            best_score = max(self.scores.values())
+            self.successes.append(
+                self.best_score is not None and best_score > self.best_score
+            )
+            if self.best_score is None or best_score > self.best_score:
+                self.best_score = best_score
+            if len(self.successes) < ADAPTATION_WINDOW:
+                return
+            success_rate = sum(self.successes) / len(self.successes)
+            self.successes = []
+            if success_rate > 1 / 5:
+                rate /= ADAPTATION_FACTOR
+            elif success_rate < 1 / 5:
+                rate *= ADAPTATION_FACTOR
+        elif self.mutation_mode == "diversity":
+            # More mutation when the population converges on a few genomes
+            distinct = {pack_combination(c) for c in self.population.values()}
+            if len(distinct) / len(self.population) < DIVERSITY_TARGET:
+                rate /= ADAPTATION_FACTOR
+            else:
+                rate *= ADAPTATION_FACTOR
+        else:
+            return
+        self.current_mutation_rate = max(
+            MIN_ADAPTIVE_RATE, min(MAX_MUTATION_RATE, rate)
+        )
 
-    def run_many_experiments(self, num_exp=200):
-        del self.all_secrets_found
-        self.all_secrets_found = []
+    def mean_mutation_rate(self):
+        if self.mutation_rates:
+            return sum(self.mutation_rates.values()) / len(self.mutation_rates)
+        return self.current_mutation_rate
 
-        # Run exp
-        for i in range(num_exp):
-            self.reset_game()
-            while not self.found:
-                self.next_generation()
-                self.check_solution(run_many_exp=True)
+    def remove_duplicates(self, survivors):
+        # Returns the genomes {index: tuple} of the population once deduplicated
+        genomes = {}
+        seen = set()  # Hash set of the genomes already present in this generation
+        duplicates = 0
+        for idx, combination in self.population.items():
+            genome = tuple(combination)
+            if genome in seen:
+                duplicates += 1
+                retries = 0
+                while genome in seen and retries < MAX_DEDUP_RETRIES:
+                    # One new crossover, then random gene changes: a crossover
+                    # of converged survivors mostly gives a known genome again
+                    if retries == 0:
+                        parents = self.rng.sample(survivors, 2)
+                        combination = crossover(parents[0], parents[1], self.rng)
+                    else:
+                        combination = mutate_one_gene(combination[:], self.rng)
+                    genome = tuple(combination)
+                    retries += 1
+                self.population[idx] = combination
+                if genome not in seen:
+                    # Found a genome not in the generation yet, within the retries
+                    self.duplicates_replaced += 1
+            seen.add(genome)
+            genomes[idx] = genome
+
+        self.checked_genomes += len(self.population)
+        self.duplicates += duplicates
+        self.duplicate_rate = duplicates / len(self.population)
+        return genomes
+
+    def score_new_genomes(self, genomes):
+        # The genomes already scored in the previous generation (unmutated
+        # survivors, children equal to a former genome) keep their score
+        if self.consistency_mode:
+            scoring_function, reference = consistency_score, self.history
+        else:
+            scoring_function, reference = score_combination, self.target_combination
+        previous_scores = self.genome_scores
+        self.genome_scores = {}
+        scores = {}
+        for idx, genome in genomes.items():
+            score = previous_scores.get(genome)
+            if score is None:
+                score = scoring_function(genome, reference)
+                self.evaluations += 1
+            else:
+                self.evaluations_avoided += 1
+            scores[idx] = score
+            self.genome_scores[genome] = score
+        return scores
+
+    def search_consistent_guess(self, deadline=None):
+        # Evolve until a combination agrees with all past feedbacks (score 0),
+        # returns False if the deadline came first
+        while 0 not in self.scores.values():
+            if self.inner_generation >= CONSISTENCY_MAX_GENERATIONS:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            self.evolve_population()
+            self.inner_generation += 1
+        return True
+
+    def play_consistent_guess(self):
+        # Play the most consistent combination, played guesses are never consistent
+        self.inner_generation = 0
+        best_idx = max(self.scores, key=self.scores.get)
+        guess = tuple(self.population[best_idx])
+        feedback = match_counts(guess, self.target_combination)
+        self.history.append((guess, feedback))
+
+        # The new feedback changes the fitness of the whole population
+        del self.scores
+        self.scores = self.evaluate_population()
+        self.best_score = None
 
-        # Logs stats for printing
-        self.stats_exp["Min"] = min(self.all_secrets_found)
-        self.stats_exp["Max"] = max(self.all_secrets_found)
-        self.stats_exp["Moyenne"] = round(
-            sum(self.all_secrets_found) / len(self.all_secrets_found)
+        del self.survivors
+        self.survivors = get_top_combinations(
+            self.population, self.scores, self.population_size // 2
         )
-        self.stats_exp["Ecart-type"] = round(statistics.stdev(self.all_secrets_found))
 
-    def run_game(self):
-        # Fixed values
-        dict_params = {
-            "Longueur Code Secret": self.target_length,
-            "Taille Population": self.population_size,
-            "Mutation (%)": self.mutation_rate,
+    def experiment_config(self, num_exp, precision, confidence, batch_size, seed):
+        return {
+            "target_length": self.target_length,
+            "population_size": self.population_size,
+            "mutation_rate": self.mutation_rate,
+            "consistency_mode": self.consistency_mode,
+            "deduplicate": self.deduplicate,
+            "mutation_mode": self.mutation_mode,
+            "num_exp": num_exp,
+            "precision": precision,
+            "confidence": confidence,
+            "batch_size": batch_size,
+            "seed": seed,
         }
-        running = True
-        run_all = False
-        self.check_solution()  # If the initial population contains the solution
-        while running:
-            # Draw gradient background
-            self.draw_gradient_background(
-                screen, (200, 200, 200), (100, 100, 100)
-            )  # Light gray to dark gray
-
-            # Display the chosen parameters
-            self.display_variables(
-                dict_params, screen, font_small, 1150, 140, (0, 0, 0)
-            )
 
-            # Display the stats
-            self.display_variables(
-                self.stats_exp, screen, font_small, 1280, 280, (0, 0, 0)
-            )
+    def save_checkpoint(self, path, config, running_stats, game_cpu_time):
+        state = {
+            "config": config,
+            "rng_state": self.rng.getstate(),
+            "running_stats": vars(running_stats),
+            "game_cpu_time": game_cpu_time,
+            "game": {key: getattr(self, key) for key in CHECKPOINT_ATTRIBUTES},
+        }
 
-            if self.show_secret_code:
-                # Display 'Secret Code'
-                self.draw_secret_code()
-                secret_text = font_medium.render("Code Secret :", True, (0, 0, 0))
-                screen.blit(
-                    secret_text, (SCREEN_WIDTH - 375 - secret_text.get_width() // 2, 25)
-                )
+        # Write to a temporary file then rename it, so a checkpoint is never partial
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    def load_checkpoint(self, path, config):
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as file:
+            state = pickle.load(file)
+
+        # A checkpoint of other experiments is ignored and will be overwritten
+        if state["config"] != config:
+            return None
+        for key, value in state["game"].items():
+            setattr(self, key, value)
+        self.rng.setstate(state["rng_state"])
+        return state
+
+    def run_many_experiments(
+        self,
+        num_exp=200,
+        precision=None,
+        confidence=EXPERIMENTS_CONFIDENCE,
+        batch_size=EXPERIMENTS_BATCH_SIZE,
+        max_exp=MAX_EXPERIMENTS,
+        seed=None,
+        checkpoint_path=None,
+        checkpoint_interval=CHECKPOINT_INTERVAL,
+        progress=None,
+    ):
+        # With a precision, games are played by batches until the confidence
+        # interval of the mean generations is narrower than +/- precision.
+        # progress(running_stats) is called after each batch, the games stop
+        # if it returns False
+        if precision is not None:
+            num_exp = max_exp
+        config = self.experiment_config(
+            num_exp, precision, confidence, batch_size, seed
+        )
+        running_stats = RunningStats()
+        game_cpu_time = 0
+
+        # Resume from the checkpoint of the same experiments if there is one
+        state = None
+        if checkpoint_path is not None:
+            state = self.load_checkpoint(checkpoint_path, config)
+        if state is None:
+            del self.all_secrets_found, self.all_cpu_times
+            self.all_secrets_found, self.all_cpu_times = [], []
+            self.checked_genomes, self.duplicates, self.duplicates_replaced = 0, 0, 0
+            self.evaluations_avoided = 0
+            if seed is not None:
+                self.rng.seed(seed)
+        else:
+            vars(running_stats).update(state["running_stats"])
+            game_cpu_time = state["game_cpu_time"]
+        resume_game = state is not None
+        last_checkpoint = time.monotonic()
 
-            self.draw_population()
-            self.draw_histogram("10 Dernières Parties")
+        # Run exp
+        while running_stats.count < num_exp:
+            start = time.process_time()
+            if resume_game:
+                resume_game = False
+            else:
+                self.reset_game()
+                game_cpu_time = 0
+            while not self.found:
+                self.next_generation()
+                self.check_solution(run_many_exp=True)
+                if (
+                    checkpoint_path is not None
+                    and not self.found
+                    and time.monotonic() - last_checkpoint >= checkpoint_interval
+                ):
+                    self.save_checkpoint(
+                        checkpoint_path,
+                        config,
+                        running_stats,
+                        game_cpu_time + time.process_time() - start,
+                    )
+                    last_checkpoint = time.monotonic()
+            self.all_cpu_times.append(game_cpu_time + time.process_time() - start)
+            running_stats.push(self.generation)
+            if running_stats.count % batch_size == 0:
+                if (
+                    precision is not None
+                    and running_stats.half_width(confidence) <= precision
+                ):
+                    break
+                if progress is not None and not progress(running_stats):
+                    break
+
+        # The experiments are over, the next run starts from scratch
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
 
-            # Display generation number
-            generation_text = font_medium.render(
-                f"Génération : {self.generation}", True, (0, 0, 0)
+        # Logs stats for printing
+        self.log_experiment_stats(running_stats, confidence)
+
+    def log_experiment_stats(self, running_stats, confidence, dispatch=None):
+        self.stats_exp["Min"] = running_stats.min
+        self.stats_exp["Max"] = running_stats.max
+        self.stats_exp["Moyenne"] = round(running_stats.mean)
+        self.stats_exp["Ecart-type"] = round(running_stats.stdev())
+        self.stats_exp[f"IC {round(100 * confidence)}%"] = (
+            f"± {round(running_stats.half_width(confidence), 2)}"
+        )
+        self.stats_exp["Parties"] = running_stats.count
+        self.stats_exp["Temps CPU (ms)"] = round(
+            1000 * sum(self.all_cpu_times) / len(self.all_cpu_times), 2
+        )
+        if self.deduplicate:
+            self.stats_exp["Doublons (%)"] = round(
+                100 * self.duplicates / max(self.checked_genomes, 1), 1
             )
-            screen.blit(
-                generation_text,
-                (SCREEN_WIDTH // 2 - generation_text.get_width() // 2, 25),
+            self.stats_exp["Doublons remplacés"] = self.duplicates_replaced
+            self.stats_exp["Scores évités"] = self.evaluations_avoided
+        # Time the pool server took to start the first game, when it played them
+        self.stats_exp.pop("Lancement (ms)", None)
+        if dispatch is not None:
+            self.stats_exp["Lancement (ms)"] = round(1000 * dispatch, 1)
+
+    def run_window_experiments(self, dict_params):
+        # Games until the precision, played from the game screen: the stats are
+        # drawn again after each batch, Escape or a click stops the games
+        def show_progress(running_stats):
+            self.log_experiment_stats(running_stats, EXPERIMENTS_CONFIDENCE)
+            self.draw_game_screen(dict_params)
+            help_text = font_super_small.render(
+                "Echap ou clic : arrêter", True, (0, 0, 0)
             )
+            screen.blit(help_text, (930, 465))
+            pygame.display.update()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.event.post(event)  # Left to the game loop
+                    return False
+                if event.type == pygame.MOUSEBUTTONDOWN or (
+                    event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
+                ):
+                    return False
+            return True
+
+        self.run_many_experiments(
+            precision=EXPERIMENTS_PRECISION,
+            max_exp=MAX_WINDOW_EXPERIMENTS,
+            progress=show_progress,
+        )
 
-            # Button coordinates
-            button_y = SCREEN_HEIGHT - 55
-
-            # Interactive buttons
-            mouse_pos = pygame.mouse.get_pos()
-            next_gen_hover = (
-                20 < mouse_pos[0] < 400 and button_y < mouse_pos[1] < button_y + 70
-            )
-            run_all_hover = (
-                SCREEN_WIDTH - 240 < mouse_pos[0] < SCREEN_WIDTH - 20
-                and button_y < mouse_pos[1] < button_y + 70
-            )
-            reset_hover = (
-                SCREEN_WIDTH // 2 - 100 < mouse_pos[0] < SCREEN_WIDTH // 2 + 200
-                and button_y < mouse_pos[1] < button_y + 70
+    def run_pooled_experiments(self, num_exp=200):
+        # The games are played by the warm workers of mastermind_pool.py when it
+        # is running, here otherwise
+        parameters = {
+            "length": self.target_length,
+            "population": self.population_size,
+            "mutation": self.mutation_rate,
+            "mutation_mode": self.mutation_mode,
+            "consistency": self.consistency_mode,
+            "dedup": self.deduplicate,
+        }
+        try:
+            response = pooled_experiments(
+                "v1", parameters, num_exp, seed=self.rng.randrange(2**32)
             )
-            run_many_exp_hover = 930 < mouse_pos[0] < 1160 and 340 < mouse_pos[1] < 395
+        except OSError:
+            self.run_many_experiments(num_exp=num_exp)
+            return
+        running_stats = RunningStats()
+        for generations in response["generations"]:
+            running_stats.push(generations)
+        self.all_secrets_found = response["generations"]
+        self.all_cpu_times = response["cpu_times"]
+        (
+            self.checked_genomes,
+            self.duplicates,
+            self.duplicates_replaced,
+            self.evaluations_avoided,
+        ) = response["counters"]
+        self.log_experiment_stats(
+            running_stats, EXPERIMENTS_CONFIDENCE, dispatch=response["dispatch"]
+        )
 
-            # Draw buttons
-            next_gen_button = self.draw_button(
+    def game_buttons(self):
+        # dict {name: (x, y, text, font, background color)}
+        button_y = SCREEN_HEIGHT - 55
+        return {
+            "next_gen": (
                 20,
                 button_y,
                 "Génération Suivante",
                 font_medium,
                 (0, 158, 115),
-                (0, 0, 0),
-                (0, 0, 0),
-                hover=next_gen_hover,
-            )
-            run_all_button = self.draw_button(
+            ),
+            "run_all": (
                 SCREEN_WIDTH - 240,
                 button_y,
                 "Finir Partie",
                 font_medium,
                 (86, 180, 233),
-                (0, 0, 0),
-                (0, 0, 0),
-                hover=run_all_hover,
-            )
-            reset_button = self.draw_button(
+            ),
+            "reset": (
                 SCREEN_WIDTH // 2 - 100,
                 button_y,
                 "Nouvelle Partie",
                 font_medium,
                 (230, 159, 0),
-                (0, 0, 0),
-                (0, 0, 0),
-                hover=reset_hover,
-            )
-            run_many_exp_button = self.draw_button(
+            ),
+            "run_many_exp": (
                 930,
                 350,
                 "Lancer 200 Parties",
                 font_super_small,
                 (240, 228, 66),
-                (0, 0, 0),
-                (0, 0, 0),
-                hover=run_many_exp_hover,
+            ),
+            "run_precise_exp": (
+                930,
+                410,
+                f"Lancer jusqu'à ±{EXPERIMENTS_PRECISION}",
+                font_super_small,
+                (240, 228, 66),
+            ),
+        }
+
+    def draw_game_button(self, name, hover=False):
+        x, y, text, font, bg_color = self.game_buttons()[name]
+        return self.draw_button(
+            x, y, text, font, bg_color, (0, 0, 0), (0, 0, 0), hover=hover
+        )
+
+    def redraw_game_button(self, name, hover):
+        # Restores the background under the button before drawing it again
+        rect = self.button_rects[name]
+        screen.blit(self.background, rect, rect)
+        return self.draw_game_button(name, hover=hover)
+
+    def draw_game_screen(self, dict_params, hovered=None):
+        # Draw gradient background
+        self.draw_gradient_background(
+            screen, (200, 200, 200), (100, 100, 100)
+        )  # Light gray to dark gray
+
+        # Display the chosen parameters
+        self.display_variables(dict_params, screen, font_small, 1150, 140, (0, 0, 0))
+
+        # Display the stats, smaller with the duplicates and pool counters so
+        # that the panel stays above the histogram
+        stats_font = font_super_small
+        if len(self.stats_exp) > STATS_PANEL_LINES:
+            stats_font = font_tiny
+        self.display_variables(
+            self.stats_exp,
+            screen,
+            stats_font,
+            1280,
+            280,
+            (0, 0, 0),
+            line_spacing=2,
+        )
+
+        if self.show_secret_code:
+            # Display 'Secret Code'
+            self.draw_secret_code()
+            secret_text = font_medium.render("Code Secret :", True, (0, 0, 0))
+            screen.blit(
+                secret_text, (SCREEN_WIDTH - 375 - secret_text.get_width() // 2, 25)
             )
 
-            pygame.display.update()
+        self.draw_population()
+        self.draw_histogram("10 Dernières Parties")
 
-            for event in pygame.event.get():
+        # Display generation number
+        generation_label = "Coup" if self.consistency_mode else "Génération"
+        generation_text = font_medium.render(
+            f"{generation_label} : {self.generation}", True, (0, 0, 0)
+        )
+        screen.blit(
+            generation_text,
+            (SCREEN_WIDTH // 2 - generation_text.get_width() // 2, 25),
+        )
+
+        # Display the duplicate rate of the last generation and the current
+        # rate of the adaptive mutation modes, under the generation number
+        generation_info = []
+        if self.deduplicate:
+            generation_info.append(f"Doublons : {round(100 * self.duplicate_rate)} %")
+        if self.mutation_mode != "fixed":
+            generation_info.append(
+                f"Mutation : {round(self.mean_mutation_rate())} % "
+                f"({MUTATION_MODES[self.mutation_mode]})"
+            )
+        if generation_info:
+            info_text = font_super_small.render(
+                "   ".join(generation_info), True, (0, 0, 0)
+            )
+            screen.blit(
+                info_text,
+                (SCREEN_WIDTH // 2 - info_text.get_width() // 2, 62),
+            )
+
+        # Interactive buttons
+        self.button_rects = {
+            name: self.draw_game_button(name, hover=name == hovered)
+            for name in self.game_buttons()
+        }
+
+    def run_game(self):
+        # Fixed values
+        dict_params = {
+            "Longueur Code Secret": self.target_length,
+            "Taille Population": self.population_size,
+            "Mutation (%)": self.mutation_rate,
+        }
+        scheduler = RenderScheduler()
+        running = True
+        run_all = False
+        self.check_solution()  # If the initial population contains the solution
+        while running:
+            # The screen is only drawn again when the game changed
+            if scheduler.full_redraw:
+                self.draw_game_screen(dict_params, hovered=scheduler.hovered)
+            scheduler.present()
+
+            for event in scheduler.events():
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type == pygame.MOUSEMOTION:
+                    scheduler.update_hover(
+                        self.button_rects, event.pos, self.redraw_game_button
+                    )
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     # Click on "Next Generation"
-                    if next_gen_button.collidepoint(event.pos):
+                    if self.button_rects["next_gen"].collidepoint(event.pos):
                         self.next_generation()
                         self.check_solution()
+                        scheduler.invalidate()
                     # Click on "Run All"
-                    elif run_all_button.collidepoint(event.pos):
+                    elif self.button_rects["run_all"].collidepoint(event.pos):
                         run_all = True
                     # Click on "Reset Game"
-                    elif reset_button.collidepoint(event.pos):
+                    elif self.button_rects["reset"].collidepoint(event.pos):
                         self.reset_game()
                         run_all = False
                         self.check_solution()
+                        scheduler.invalidate()
                     # Click on "Launch experiments"
-                    elif run_many_exp_button.collidepoint(event.pos):
-                        self.run_many_experiments()
+                    elif self.button_rects["run_many_exp"].collidepoint(event.pos):
+                        self.run_pooled_experiments()
+                        self.reset_game()
+                        run_all = False
+                        self.check_solution()
+                        scheduler.invalidate()
+                    # Click on "Launch experiments until precision"
+                    elif self.button_rects["run_precise_exp"].collidepoint(event.pos):
+                        self.run_window_experiments(dict_params)
                         self.reset_game()
                         run_all = False
                         self.check_solution()
+                        scheduler.invalidate()
 
             # Automatically run all generations
-            if run_all:
+            if run_all and not self.found:
                 while not self.found:
                     self.next_generation()
                     self.check_solution()
+                scheduler.invalidate()
+
+    def show_frame(self, log, index):
+        # Copy a recorded generation into the game so the drawing methods show it
+        (
+            self.generation,
+            self.target_combination,
+            self.population,
+            self.scores,
+            self.survivors,
+        ) = log.frame(index)
+
+    def draw_timeline(self, log, index, first, last):
+        # Slider over the generations of the replayed game
+        track = pygame.Rect(100, SCREEN_HEIGHT - 45, SCREEN_WIDTH - 200, 10)
+        pygame.draw.rect(screen, (240, 240, 240), track, border_radius=5)
+        pygame.draw.rect(screen, (0, 0, 0), track, 2, border_radius=5)
+        ratio = (index - first) / max(last - 1 - first, 1)
+        handle_x = track.x + round(ratio * track.width)
+        pygame.draw.circle(screen, (0, 0, 0), (handle_x, track.centery), 14)
+        pygame.draw.circle(screen, (86, 180, 233), (handle_x, track.centery), 12)
+        return track
+
+    def draw_replay_frame(self, log, index):
+        self.show_frame(log, index)
+        game = log.game_of(index)
+        last = log.game_range(game)[1]
+
+        # Histogram of the previous games of the log
+        self.secrets_found = [
+            log.read_record(log.game_range(previous)[1] - 1)[0]
+            for previous in range(max(0, game - 10), game)
+        ]
+
+        self.draw_gradient_background(screen, (200, 200, 200), (100, 100, 100))
+        self.display_variables(
+            {
+                "Longueur Code Secret": self.target_length,
+                "Taille Population": self.population_size,
+                "Partie": f"{game + 1} / {len(log.game_starts)}",
+            },
+            screen,
+            font_small,
+            1150,
+            140,
+            (0, 0, 0),
+        )
+        if self.show_secret_code:
+            self.draw_secret_code()
+            secret_text = font_medium.render("Code Secret :", True, (0, 0, 0))
+            screen.blit(
+                secret_text, (SCREEN_WIDTH - 375 - secret_text.get_width() // 2, 25)
+            )
+        self.draw_population()
+        self.draw_histogram("Parties Précédentes")
+
+        generation_text = font_medium.render(
+            f"Génération : {self.generation} / {log.read_record(last - 1)[0]}",
+            True,
+            (0, 0, 0),
+        )
+        screen.blit(
+            generation_text,
+            (SCREEN_WIDTH // 2 - generation_text.get_width() // 2, 25),
+        )
+
+    def run_replay(self, log, game=0):
+        game = max(0, min(game, len(log.game_starts) - 1))
+        first, last = log.game_range(game)
+        index = first
+        dragging = False
+        scheduler = RenderScheduler()
+        running = True
+        while running:
+            if scheduler.full_redraw:
+                self.draw_replay_frame(log, index)
+                help_text = font_super_small.render(
+                    "Flèches : génération / partie, Début / Fin", True, (0, 0, 0)
+                )
+                screen.blit(help_text, (100, SCREEN_HEIGHT - 85))
+                track = self.draw_timeline(log, index, first, last)
+            scheduler.present()
+
+            shown_index = index
+            for event in scheduler.events():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN and track.inflate(
+                    0, 30
+                ).collidepoint(event.pos):
+                    dragging = True
+                elif event.type == pygame.MOUSEBUTTONUP:
+                    dragging = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_RIGHT:
+                        index = min(index + 1, last - 1)
+                    elif event.key == pygame.K_LEFT:
+                        index = max(index - 1, first)
+                    elif event.key == pygame.K_PAGEUP:
+                        index = min(index + 10, last - 1)
+                    elif event.key == pygame.K_PAGEDOWN:
+                        index = max(index - 10, first)
+                    elif event.key == pygame.K_HOME:
+                        index = first
+                    elif event.key == pygame.K_END:
+                        index = last - 1
+                    elif event.key in (pygame.K_UP, pygame.K_DOWN):
+                        step = 1 if event.key == pygame.K_DOWN else -1
+                        game = max(0, min(game + step, len(log.game_starts) - 1))
+                        first, last = log.game_range(game)
+                        index = first
+
+                # Scrub to the generation under the mouse
+                if dragging and event.type in (
+                    pygame.MOUSEBUTTONDOWN,
+                    pygame.MOUSEMOTION,
+                ):
+                    ratio = (event.pos[0] - track.x) / track.width
+                    ratio = max(0.0, min(1.0, ratio))
+                    index = first + round(ratio * (last - 1 - first))
+            if index != shown_index:
+                scheduler.invalidate()
+
+
+##---DASHBOARD---##
+##---------------##
+class Dashboard:
+    # Many games advanced in turn, each drawn as a small board. The games get
+    # the time of each frame left by the drawing, so the frame rate holds
+    # whatever the number of games.
+    def __init__(self, games):
+        self.games = list(games)
+        for game in self.games:
+            game.found = game.is_solved()  # If the initial population has the solution
+        self.next_game = 0  # Game advanced first at the next frame
+        # Time of the last solve and its generations, for each board
+        self.solved_at = [None] * len(self.games)
+        self.last_generations = [None] * len(self.games)
+        self.stats = RunningStats()
+        self.total_generations = 0
+        self.start_time = time.perf_counter()
+
+        # Boards on a grid, as square as possible
+        columns = math.ceil(math.sqrt(len(self.games)))
+        rows = math.ceil(len(self.games) / columns)
+        width, height = DASHBOARD_WIDTH // columns, SCREEN_HEIGHT // rows
+        self.board_rects = [
+            pygame.Rect((i % columns) * width, (i // columns) * height, width, height)
+            for i in range(len(self.games))
+        ]
+        self.stats_rect = pygame.Rect(
+            DASHBOARD_WIDTH, 0, SCREEN_WIDTH - DASHBOARD_WIDTH, SCREEN_HEIGHT
+        )
+        # Text of the boards, smaller when there are many boards
+        self.board_font = pygame.font.Font(None, max(16, min(30, width // 6)))
+        self.peg_colors = {
+            color: self.games[0].get_color_from_name(color) for color in COLORS
+        }
+
+        # Empty boards drawn once, then copied at each frame
+        self.board_backgrounds = {}
+        for highlighted, bg_color in [(False, (200, 200, 200)), (True, (0, 158, 115))]:
+            background = pygame.Surface((width, height))
+            background.fill(START_SCREEN_COLOR)
+            board = background.get_rect().inflate(-8, -8)
+            pygame.draw.rect(background, bg_color, board, border_radius=8)
+            pygame.draw.rect(background, (0, 0, 0), board, 2, border_radius=8)
+            self.board_backgrounds[highlighted] = background.convert()
+
+    def advance(self, deadline):
+        # One generation of a game at a time, the games in turn, until the
+        # deadline: a frame never waits for every game, and a long guess of the
+        # consistency mode goes on at the next turn of its game. A solved game
+        # starts again at once, its board is highlighted for a while
+        while time.perf_counter() < deadline:
+            index = self.next_game
+            self.next_game = (index + 1) % len(self.games)
+            game = self.games[index]
+            generation = game.generation
+            game.next_generation(deadline)
+            self.total_generations += game.generation - generation
+            game.found = game.is_solved()
+            if game.found:
+                self.stats.push(game.generation)
+                self.solved_at[index] = time.perf_counter()
+                self.last_generations[index] = game.generation
+                game.reset_game()
+                game.found = game.is_solved()
+
+    def draw_board(self, index, now):
+        game = self.games[index]
+        rect = self.board_rects[index]
+        screen.set_clip(rect)  # Nothing spills over the next boards
+        board = rect.inflate(-8, -8)
+        solved_at = self.solved_at[index]
+        highlighted = solved_at is not None and now - solved_at < DASHBOARD_HIGHLIGHT
+        screen.blit(self.board_backgrounds[highlighted], rect)  # Green after a solve
+
+        # Best combination, then the secret code below it
+        best_idx = max(game.scores, key=game.scores.get)
+        radius = max(2, min(board.width // (3 * game.target_length), board.height // 8))
+        rows = [game.population[best_idx]]
+        if game.show_secret_code:
+            rows.append(game.target_combination)
+        for row, combination in enumerate(rows):
+            y = board.y + 8 + radius + row * (2 * radius + 6)
+            for j, color in enumerate(combination):
+                center = (board.x + 8 + radius + j * (2 * radius + radius // 2), y)
+                pygame.draw.circle(screen, (0, 0, 0), center, radius)
+                pygame.draw.circle(screen, self.peg_colors[color], center, radius - 1)
+
+        # Current game, then the generations of the last solve
+        lines = [f"G {game.generation}  Score {game.scores[best_idx]}"]
+        if self.last_generations[index] is not None:
+            lines.insert(0, f"Résolu : {self.last_generations[index]}")
+        y = board.bottom - 6
+        for line in reversed(lines):
+            info_text = self.board_font.render(line, True, (0, 0, 0))
+            y -= info_text.get_height() + 2
+            screen.blit(info_text, (board.x + 8, y))
+        screen.set_clip(None)
+        return rect
+
+    def draw_stats(self, fps):
+        screen.fill(START_SCREEN_COLOR, self.stats_rect)
+        title_text = font_medium.render("Tableau de bord", True, (0, 0, 0))
+        screen.blit(
+            title_text,
+            (self.stats_rect.centerx - title_text.get_width() // 2, 40),
+        )
+        elapsed = time.perf_counter() - self.start_time
+        stats = {
+            "Parties en cours": len(self.games),
+            "Parties résolues": self.stats.count,
+            "Moyenne": round(self.stats.mean, 1),
+            "Ecart-type": round(self.stats.stdev(), 1),
+            "Min": self.stats.min,
+            "Max": self.stats.max,
+            "Générations/s": round(self.total_generations / max(elapsed, 1e-9)),
+            "Images/s": round(fps),
+        }
+        self.games[0].display_variables(
+            stats, screen, font_super_small, self.stats_rect.centerx, 120, (0, 0, 0)
+        )
+        help_text = font_super_small.render("Echap : retour", True, (0, 0, 0))
+        screen.blit(
+            help_text,
+            (self.stats_rect.centerx - help_text.get_width() // 2, SCREEN_HEIGHT - 50),
+        )
+        return self.stats_rect
+
+    def run(self):
+        scheduler = RenderScheduler()
+        scheduler.animating = True  # The games advance without waiting for events
+        frame_time = 1 / scheduler.max_fps
+        draw_time = 0.0
+        running = True
+        while running:
+            # The games get the time that the last drawing left in the frame
+            frame_start = time.perf_counter()
+            simulation_time = max(
+                DASHBOARD_MIN_SIMULATION_SHARE * frame_time,
+                DASHBOARD_FRAME_SHARE * frame_time - draw_time,
+            )
+            self.advance(frame_start + simulation_time)
+
+            # Every board changes at each frame, they are pushed as dirty rects
+            draw_start = time.perf_counter()
+            if scheduler.full_redraw:
+                screen.fill(START_SCREEN_COLOR)
+            for index in range(len(self.games)):
+                scheduler.invalidate(self.draw_board(index, draw_start))
+            scheduler.invalidate(self.draw_stats(scheduler.clock.get_fps()))
+            draw_time = time.perf_counter() - draw_start
+            scheduler.present()
+
+            for event in scheduler.events():
+                if event.type == pygame.QUIT or (
+                    event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
+                ):
+                    running = False
+
+
+##---HEADLESS EXPORT---##
+##---------------------##
+def export_frame_range(task):
+    # Renders the records [first, last) of a log without any window
+    log_path, first, last, start, output, image_format, scale = task
+    if screen is None:
+        init_display(headless=True)
+    log = GenerationLog(log_path)
+    renderer = MastermindGame(
+        target_length=log.target_length,
+        population_size=log.population_size,
+        mutation_rate=0,
+        show_secret_code=True,
+        show_best=True,
+    )
+    size = (round(SCREEN_WIDTH * scale), round(SCREEN_HEIGHT * scale))
+
+    # Raw frames are written at their own offset of the preallocated stream
+    stream = open(output, "r+b") if image_format == "raw" else None
+    for index in range(first, last):
+        renderer.draw_replay_frame(log, index)
+        frame = screen if scale == 1 else pygame.transform.smoothscale(screen, size)
+        if stream is None:
+            pygame.image.save(frame, os.path.join(output, f"frame_{index:06d}.png"))
+        else:
+            stream.seek((index - start) * size[0] * size[1] * 3)
+            stream.write(pygame.image.tobytes(frame, "RGB"))
+    if stream is not None:
+        stream.close()
+    log.close()
+    return last - first
+
+
+def export_frames(
+    log_path, output, image_format="png", game=None, workers=None, scale=1.0
+):
+    # One image per recorded generation, as PNG files in the output directory
+    # or as a single stream of raw RGB frames
+    log = GenerationLog(log_path)
+    start, stop = (0, len(log)) if game is None else log.game_range(game)
+    log.close()
+    if image_format == "png":
+        os.makedirs(output, exist_ok=True)
+    else:
+        frame_size = round(SCREEN_WIDTH * scale) * round(SCREEN_HEIGHT * scale) * 3
+        with open(output, "wb") as stream:
+            stream.truncate((stop - start) * frame_size)
+
+    # Several chunks per worker so that the processes finish together
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, -(-(stop - start) // (workers * 4)))
+    tasks = [
+        (log_path, first, min(first + chunk, stop), start, output, image_format, scale)
+        for first in range(start, stop, chunk)
+    ]
+    begin = time.perf_counter()
+    if workers == 1:
+        frames = sum(export_frame_range(task) for task in tasks)
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            frames = sum(pool.imap_unordered(export_frame_range, tasks))
+    return frames, time.perf_counter() - begin
+
+
+##---MUTATION BENCHMARK---##
+##------------------------##
+def benchmark_task(task):
+    # Generations needed to solve the games of one mutation setting
+    length, mutation_mode, mutation_rate, config = task
+    game = MastermindGame(
+        target_length=length,
+        population_size=config["population"],
+        mutation_rate=mutation_rate,
+        show_secret_code=False,
+        show_best=False,
+        consistency_mode=config["consistency"],
+        deduplicate=config["dedup"],
+        mutation_mode=mutation_mode,
+    )
+    game.run_many_experiments(num_exp=config["games"], seed=config["seed"])
+    generations = game.all_secrets_found
+    return {
+        "length": length,
+        "mode": mutation_mode,
+        "rate": mutation_rate,
+        "mean": statistics.fmean(generations),
+        "p99": statistics.quantiles(generations, n=100, method="inclusive")[98],
+    }
+
+
+def benchmark_mutation(lengths, rates, config, workers=None):
+    # Every fixed rate is played first, the adaptive modes then start from the
+    # best fixed rate of each length
+    with multiprocessing.Pool(workers) as pool:
+        best_fixed = {}
+        fixed_tasks = [
+            (length, "fixed", rate, config) for length in lengths for rate in rates
+        ]
+        for row in pool.map(benchmark_task, fixed_tasks):
+            best = best_fixed.get(row["length"])
+            if best is None or row["mean"] < best["mean"]:
+                best_fixed[row["length"]] = row
+        adaptive_tasks = [
+            (length, mode, best_fixed[length]["rate"], config)
+            for length in lengths
+            for mode in MUTATION_MODES
+            if mode != "fixed"
+        ]
+        adaptive = pool.map(benchmark_task, adaptive_tasks)
+    return [best_fixed[length] for length in lengths] + adaptive
+
+
+##---COMMAND LINE---##
+##------------------##
+def add_game_arguments(parser):
+    parser.add_argument("--length", type=int, default=4, help="longueur du code")
+    parser.add_argument("--population", type=int, default=8, help="taille population")
+    parser.add_argument("--mutation", type=int, default=80, help="mutation (%%)")
+    parser.add_argument(
+        "--mutation-mode",
+        choices=list(MUTATION_MODES),
+        default="fixed",
+        help="adaptation du taux de mutation",
+    )
+    parser.add_argument(
+        "--consistency", action="store_true", help="mode cohérence (un essai par coup)"
+    )
+    parser.add_argument("--dedup", action="store_true", help="population sans doublons")
+    parser.add_argument("--seed", type=int, default=None, help="graine aléatoire")
+
+
+def game_from_args(args, seed=None):
+    return MastermindGame(
+        target_length=args.length,
+        population_size=args.population,
+        mutation_rate=args.mutation,
+        show_secret_code=False,
+        show_best=False,
+        consistency_mode=args.consistency,
+        deduplicate=args.dedup,
+        mutation_mode=args.mutation_mode,
+        seed=seed,
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Mastermind résolu par un algorithme génétique. "
+        "Sans commande, le jeu s'ouvre dans une fenêtre PyGame."
+    )
+    parser.add_argument(
+        "--record", default=None, help="enregistre chaque génération dans ce fichier"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    experiments = subparsers.add_parser(
+        "experiments", help="lance des parties sans affichage"
+    )
+    add_game_arguments(experiments)
+    experiments.add_argument("--games", type=int, default=200, help="nombre de parties")
+    experiments.add_argument(
+        "--precision",
+        type=float,
+        default=None,
+        help="joue jusqu'à ce que l'intervalle de confiance soit ± precision",
+    )
+    experiments.add_argument("--confidence", type=float, default=EXPERIMENTS_CONFIDENCE)
+    experiments.add_argument("--max-games", type=int, default=MAX_EXPERIMENTS)
+    experiments.add_argument(
+        "--checkpoint", default=None, help="fichier de sauvegarde pour reprendre"
+    )
+    experiments.add_argument(
+        "--checkpoint-interval", type=float, default=CHECKPOINT_INTERVAL
+    )
+    experiments.add_argument(
+        "--record", default=None, help="enregistre chaque génération dans ce fichier"
+    )
+    experiments.add_argument(
+        "--metrics-file",
+        default=None,
+        help="fichier de métriques Prometheus réécrit en continu",
+    )
+    experiments.add_argument(
+        "--metrics-port", type=int, default=None, help="sert /metrics sur ce port"
+    )
+    experiments.add_argument("--metrics-interval", type=float, default=METRICS_INTERVAL)
+
+    replay = subparsers.add_parser("replay", help="rejoue un enregistrement")
+    replay.add_argument("log", help="fichier créé avec --record")
+    replay.add_argument("--game", type=int, default=1, help="numéro de la partie")
+
+    export = subparsers.add_parser(
+        "export", help="exporte un enregistrement en images, sans fenêtre"
+    )
+    export.add_argument("log", help="fichier créé avec --record")
+    export.add_argument("output", help="dossier des PNG ou fichier de trames brutes")
+    export.add_argument("--format", choices=["png", "raw"], default="png")
+    export.add_argument("--game", type=int, default=None, help="une seule partie")
+    export.add_argument("--workers", type=int, default=None, help="processus")
+    export.add_argument("--scale", type=float, default=1.0, help="échelle des images")
+
+    dashboard = subparsers.add_parser(
+        "dashboard", help="affiche de nombreuses parties en même temps"
+    )
+    add_game_arguments(dashboard)
+    dashboard.add_argument(
+        "--games", type=int, default=DASHBOARD_GAMES, help="nombre de parties"
+    )
+    dashboard.add_argument(
+        "--hide-secret", action="store_true", help="cache les codes secrets"
+    )
+
+    benchmark = subparsers.add_parser(
+        "benchmark-mutation",
+        help="compare les modes de mutation au meilleur taux fixe",
+    )
+    benchmark.add_argument(
+        "--lengths", type=int, nargs="+", default=[3, 4, 5, 6], help="longueurs"
+    )
+    benchmark.add_argument(
+        "--rates", type=int, nargs="+", default=[5, 10, 20, 40, 80], help="taux fixes"
+    )
+    benchmark.add_argument(
+        "--population", type=int, default=8, help="taille population"
+    )
+    benchmark.add_argument("--games", type=int, default=200, help="parties par réglage")
+    benchmark.add_argument(
+        "--consistency", action="store_true", help="mode cohérence (un essai par coup)"
+    )
+    benchmark.add_argument(
+        "--dedup", action="store_true", help="population sans doublons"
+    )
+    benchmark.add_argument("--seed", type=int, default=0, help="graine aléatoire")
+    benchmark.add_argument("--workers", type=int, default=None, help="processus")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "experiments":
+        game = game_from_args(args)
+        if args.record is not None:
+            game.start_recording(args.record, record_current_game=False)
+        exporter = None
+        if args.metrics_file is not None or args.metrics_port is not None:
+            exporter = MetricsExporter(
+                game,
+                path=args.metrics_file,
+                port=args.metrics_port,
+                interval=args.metrics_interval,
+            )
+            exporter.start()
+        game.run_many_experiments(
+            num_exp=args.games,
+            precision=args.precision,
+            confidence=args.confidence,
+            max_exp=args.max_games,
+            seed=args.seed,
+            checkpoint_path=args.checkpoint,
+            checkpoint_interval=args.checkpoint_interval,
+        )
+        if exporter is not None:
+            exporter.close()
+        for name, value in game.stats_exp.items():
+            print(f"{name} : {value}")
+        if game.recorder is not None:
+            game.recorder.close()
+    elif args.command == "replay":
+        log = GenerationLog(args.log)
+        init_display()
+        game = MastermindGame(
+            target_length=log.target_length,
+            population_size=log.population_size,
+            mutation_rate=0,
+            show_secret_code=True,
+            show_best=True,
+        )
+        game.run_replay(log, args.game - 1)
+        log.close()
+    elif args.command == "export":
+        frames, elapsed = export_frames(
+            args.log,
+            args.output,
+            image_format=args.format,
+            game=None if args.game is None else args.game - 1,
+            workers=args.workers,
+            scale=args.scale,
+        )
+        print(f"{frames} images en {elapsed:.2f} s ({frames / elapsed:.0f} images/s)")
+    elif args.command == "dashboard":
+        init_display()
+        games = []
+        for i in range(max(1, min(args.games, MAX_DASHBOARD_GAMES))):
+            # Each game gets its own seed so that the boards differ
+            game = game_from_args(args, None if args.seed is None else args.seed + i)
+            game.show_secret_code = not args.hide_secret
+            games.append(game)
+        Dashboard(games).run()
+    elif args.command == "benchmark-mutation":
+        config = {
+            "population": args.population,
+            "games": args.games,
+            "consistency": args.consistency,
+            "dedup": args.dedup,
+            "seed": args.seed,
+        }
+        rows = benchmark_mutation(args.lengths, args.rates, config, args.workers)
+        print(f"{'Longueur':>8}  {'Mode':<16}{'Taux':>6}{'Moyenne':>10}{'p99':>8}")
+        for row in sorted(rows, key=lambda row: row["length"]):
+            print(
+                f"{row['length']:>8}  {MUTATION_MODES[row['mode']]:<16}"
+                f"{row['rate']:>6}{row['mean']:>10.1f}{row['p99']:>8.1f}"
+            )
+    else:
+        init_display()
+        start_screen = StartScreen(record_path=args.record)
+        start_screen.show()
 
 
 if __name__ == "__main__":
-    start_screen = StartScreen()
-    start_screen.show()
+    main()